@@ -0,0 +1,83 @@
+# Steady-state allocation check for the analysis + compositing hot path
+#
+#   python -m benchmarks.bench_allocations
+#
+# Runs a few warm-up frames, then traces FRAMES more with tracemalloc and
+# fails (exit 1) if any frame allocates more than LIMIT bytes at peak.
+# The inline chain the attempt scripts used is traced too, for scale.
+
+import os
+import sys
+import tracemalloc
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import cv2
+import numpy as np
+import pygame
+
+from matrix_rain import EdgeAnalyzer, GridCompositor, get_atlas
+from matrix_rain.compositor import green_lut
+from matrix_rain.glyphs import MATRIX
+
+WIDTH, HEIGHT = 1920, 1080
+CELL_SIZE = 10
+FRAMES = 20
+LIMIT = 64 * 1024
+
+
+def inline_chain(frame, rows, cols):
+    # attempt6 / myTest before preallocation
+    frame = cv2.resize(frame, (WIDTH, HEIGHT))
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    edges = cv2.Canny(gray, 40, 120)
+    halo = cv2.GaussianBlur(edges.astype(np.float32), (0, 0), 6)
+    if halo.max() > 0:
+        halo /= halo.max()
+    small = cv2.resize(halo, (cols, rows), interpolation=cv2.INTER_AREA)
+    return np.minimum(small * 3.0, 1.0)
+
+
+def peak_per_frame(step):
+    for _ in range(3):
+        step()
+    tracemalloc.start()
+    worst = 0
+    for _ in range(FRAMES):
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        step()
+        worst = max(worst, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+    return worst
+
+
+def main():
+    pygame.init()
+    screen = pygame.display.set_mode((WIDTH, HEIGHT))
+
+    rows, cols = HEIGHT // CELL_SIZE, WIDTH // CELL_SIZE
+    frame = np.zeros((720, 1280, 3), np.uint8)
+    cv2.circle(frame, (640, 360), 200, (255, 255, 255), 6)
+
+    atlas = get_atlas("Consolas", CELL_SIZE, MATRIX)
+    glyphs = np.random.default_rng(0).integers(0, len(atlas.chars), (rows, cols))
+    analyzer = EdgeAnalyzer((WIDTH, HEIGHT), (rows, cols), (CELL_SIZE, CELL_SIZE), gain=3.0)
+    compositor = GridCompositor(atlas, rows, cols, (CELL_SIZE, CELL_SIZE),
+                                green_lut(60, 255), fade=55 / 255)
+
+    def pipeline():
+        brightness = analyzer(frame)
+        compositor.present(screen, glyphs, compositor.quantize(brightness))
+
+    old = peak_per_frame(lambda: inline_chain(frame, rows, cols))
+    new = peak_per_frame(pipeline)
+    print(f"inline chain: {old / 1e6:8.2f} MB peak per frame")
+    print(f"pipeline:     {new / 1024:8.2f} KiB peak per frame (limit {LIMIT // 1024} KiB)")
+
+    pygame.quit()
+    return 0 if new <= LIMIT else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
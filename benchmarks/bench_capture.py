@@ -0,0 +1,97 @@
+# Camera opened the attempt scripts' way vs. camera.open_camera
+#
+#   python -m benchmarks.bench_capture
+#   python -m benchmarks.bench_capture --camera 1 --size 1920x1080
+#
+# "scripts" opens the camera with OpenCV's default API and asks it for
+# the window size, as the scripts did (minus CAP_DSHOW off Windows);
+# "negotiated" is open_camera() with its defaults. For each it prints
+# the mode the driver reports and, from FRAMES reads:
+#
+#   fps      frames delivered per second
+#   read ms  p50/p99 time blocked in read()
+#   queued   frames that were already waiting after a pause: each one is
+#            a frame interval of extra latency on what gets shown
+#
+# Exits 0 with a note when there is no camera to open.
+
+import argparse
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from matrix_rain.camera import camera_mode, open_camera
+
+FRAMES = 120
+WARMUP = 10
+PAUSE = 0.5                       # seconds without reading before counting queued frames
+
+
+def scripts_open(index, size):
+    capture = cv2.VideoCapture(index)
+    if not capture.isOpened():
+        raise IOError(f"cannot open camera {index!r}")
+    capture.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+    capture.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    return capture, camera_mode(capture)
+
+
+def measure(capture):
+    for _ in range(WARMUP):
+        capture.read()
+    reads = []
+    start = time.perf_counter()
+    for _ in range(FRAMES):
+        before = time.perf_counter()
+        ok, _ = capture.read()
+        if not ok:
+            return None
+        reads.append(time.perf_counter() - before)
+    fps = FRAMES / (time.perf_counter() - start)
+
+    # after a pause, frames the driver kept come back at once
+    time.sleep(PAUSE)
+    queued = 0
+    for _ in range(8):
+        before = time.perf_counter()
+        capture.read()
+        if time.perf_counter() - before > 0.25 / fps:
+            break
+        queued += 1
+    return fps, np.percentile(reads, (50, 99)) * 1000, queued
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_capture")
+    parser.add_argument("--camera", default="0", help="camera index or device path")
+    parser.add_argument("--size", default="1920x1080",
+                        help="window size the scripts would ask for, WIDTHxHEIGHT")
+    args = parser.parse_args(argv)
+    index = int(args.camera) if args.camera.isdigit() else args.camera
+    w, h = args.size.lower().split("x")
+    size = (int(w), int(h))
+
+    print(f"{'open':<12}{'mode':<40}{'fps':>7}{'read p50':>10}{'p99':>8}{'queued':>8}")
+    for label, opener in (("scripts", lambda: scripts_open(index, size)),
+                          ("negotiated", lambda: open_camera(index))):
+        try:
+            capture, mode = opener()
+        except IOError as exc:
+            print(f"no camera: {exc}")
+            return 0
+        try:
+            result = measure(capture)
+        finally:
+            capture.release()
+        if result is None:
+            print(f"{label:<12}{str(mode):<40}  read() failed")
+            continue
+        fps, (p50, p99), queued = result
+        print(f"{label:<12}{str(mode):<40}{fps:7.1f}{p50:10.2f}{p99:8.2f}{queued:8d}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# QualityGovernor against a simulated machine: settles, holds, recovers
+#
+#   python -m benchmarks.bench_governor
+#
+# Drives the governor with made-up frame times instead of a real engine:
+# every ladder step makes a frame STEP_COST times as expensive, plus a
+# little jitter, and the machine is LOAD times slower for a while in the
+# middle (another app busy). Prints every change it makes. Fails (exit 1)
+# if it is still changing level at the end of a phase, if it ends a
+# phase over budget, or if it doesn't climb back to within one step of
+# where it was once the load is gone (the dead band between the `up`
+# and `down` thresholds may keep it that one step lower).
+#
+# Then it runs every preset headless on the synthetic camera and walks
+# its Engine down the whole ladder and back up with set_quality(),
+# rendering STEP_FRAMES frames at each level. Fails if any preset
+# raises on the way. Last, a fresh process runs IN_TURN one Engine after
+# another, as a preset switcher would; fails if it crashes, which it did
+# when a closed Engine left a cached atlas with a freed font behind.
+
+import multiprocessing
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from matrix_rain import PRESETS, Engine, SyntheticCapture
+from matrix_rain.governor import LADDER, QualityGovernor, ladder_for
+
+TARGET_FPS = 60
+BASE = 1 / 55                     # full-quality frame time: just over budget
+STEP_COST = 0.85
+JITTER = 0.1                      # relative frame time noise (std)
+LOAD = 2.0
+PHASES = [("normal", 20.0, 1.0), ("loaded", 30.0, LOAD), ("normal again", 40.0, 1.0)]
+QUIET = 8.0                       # seconds at the end of a phase with no changes
+SIZE = (640, 480)
+STEP_FRAMES = 300                 # long enough for every stream to respawn
+IN_TURN = ("attempt2", "attempt1")
+
+
+def walk_ladder(preset):
+    """Step `preset` down its whole ladder and back up; the error, or None."""
+    engine = Engine(preset, SIZE, capture=SyntheticCapture(*SIZE, fps=None), fps=None, seed=0)
+    governor = QualityGovernor(TARGET_FPS, ladder_for(engine.config, engine.analysis_cell),
+                               log=None)
+    levels = list(range(len(governor.ladder) + 1))
+    try:
+        engine.open()
+        for level in levels[1:] + levels[-2::-1]:
+            governor.level = level
+            engine.set_quality(governor.factors())
+            # frames drawn, not step() calls: nothing is drawn until the
+            # restarted analysis has a grid
+            target = engine.frames + STEP_FRAMES
+            while engine.frames < target:
+                if not engine.step():
+                    return f"at level {level}: the engine stopped"
+    except Exception as exc:
+        return f"at level {governor.level}: {exc!r}"
+    finally:
+        engine.close()
+    return None
+
+
+def run_in_turn(presets):
+    for preset in presets:
+        Engine(preset, SIZE, capture=SyntheticCapture(*SIZE, fps=None), fps=None).run(20)
+
+
+def in_turn(presets):
+    """Run `presets` one after another in a new process; its exit code."""
+    # a freed font segfaults, so keep it out of this process
+    process = multiprocessing.get_context("spawn").Process(target=run_in_turn, args=(presets,))
+    process.start()
+    process.join()
+    return process.exitcode
+
+
+def main():
+    rng = np.random.default_rng(0)
+    changes = []
+    governor = QualityGovernor(TARGET_FPS, log=None)
+    now = 0.0
+    ok = True
+    settled = None
+    for name, seconds, load in PHASES:
+        end = now + seconds
+        levels = []
+        while now < end:
+            frame = BASE * load * STEP_COST ** governor.level * (1 + JITTER * rng.standard_normal())
+            frame = max(frame, 0.001)
+            old = governor.level
+            if governor.update(frame, now):
+                changes.append((now, old, governor.level))
+                print(f"  {now:6.2f} s  level {old} -> {governor.level}"
+                      f"  ({LADDER[max(old, governor.level) - 1][0]})")
+            levels.append((now, governor.level))
+            now += max(frame, 1 / TARGET_FPS)
+
+        quiet = [t for t, _, _ in changes if end - QUIET <= t < end]
+        cost = BASE * load * STEP_COST ** governor.level
+        over = cost > governor.budget
+        passed = not quiet and not over
+        ok &= passed
+        print(f"{name:<14} {seconds:4.0f} s at load {load}: ends at level {governor.level},"
+              f" {cost * 1000:.1f} ms frames for {governor.budget * 1000:.1f} ms"
+              f"{'' if passed else '  FAIL'}")
+        if settled is None:
+            settled = governor.level
+        elif load == 1.0 and governor.level > settled + 1:
+            print(f"  did not climb back to level {settled} after the load went away  FAIL")
+            ok = False
+
+    print(f"every preset down its ladder and back, {STEP_FRAMES} frames a level:")
+    for preset in PRESETS:
+        error = walk_ladder(preset)
+        print(f"  {preset:<10} {'ok' if error is None else 'FAIL ' + error}")
+        ok &= error is None
+
+    code = in_turn(IN_TURN)
+    print(f"{', then '.join(IN_TURN)} in one process: "
+          f"{'ok' if code == 0 else f'FAIL exit code {code}'}")
+    ok &= code == 0
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
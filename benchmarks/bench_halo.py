@@ -0,0 +1,90 @@
+# Halo modes: cost against radius, and visual equivalence to the Gaussian halo
+#
+#   python -m benchmarks.bench_halo
+#
+# Times EdgeAnalyzer for each halo_mode over a range of sigmas at full
+# resolution, then compares each mode's sampled grid to the "gaussian"
+# grid on synthetic camera frames. Fails (exit 1) if a mode's mean
+# absolute difference or correlation misses its TOLERANCE.
+#
+# "pyramid" is a drop-in: the same Gaussian, blurred mostly at low
+# resolution. "distance" is a different look that glows every edge
+# equally: the Gaussian halo, normalised by its global peak, dims
+# isolated edges next to dense clusters. Its tolerance is wider to match.
+
+import sys
+import time
+
+import numpy as np
+
+from matrix_rain import EdgeAnalyzer, SyntheticCapture
+from matrix_rain.analysis import HALO_MODES
+
+WIDTH, HEIGHT = 1920, 1080
+SIGMAS = [6, 15, 35, 70]          # timed
+MATCHED = [6, 15, 35]             # checked against gaussian (attempt5 uses 35)
+REPEAT = 5
+
+# (preset-like grid, cell) pairs: per-column force and a full cell grid
+GRIDS = [((1, 60), (WIDTH // 60, None)), ((HEIGHT // 10, WIDTH // 10), (10, 10))]
+
+# mode: (max mean |diff|, min correlation) of grids against "gaussian";
+# 1/31 is one step of the 32-level brightness ramps
+TOLERANCE = {"pyramid": (1 / 31, 0.97), "distance": (0.08, 0.85)}
+
+
+def frames():
+    cap = SyntheticCapture(1280, 720, fps=None)
+    return [cap.read()[1] for _ in range(48)][::6]
+
+
+def timing(clip):
+    print(f"full-resolution ms per frame, grid {GRIDS[1][0]}")
+    print(f"{'sigma':>6}" + "".join(f"{mode:>10}" for mode in HALO_MODES))
+    grid, cell = GRIDS[1]
+    for sigma in SIGMAS:
+        row = f"{sigma:>6}"
+        for mode in HALO_MODES:
+            analyzer = EdgeAnalyzer((WIDTH, HEIGHT), grid, cell, halo=sigma, halo_mode=mode)
+            analyzer(clip[0])
+            start = time.perf_counter()
+            for _ in range(REPEAT):
+                for frame in clip:
+                    analyzer(frame)
+            row += f"{(time.perf_counter() - start) / (REPEAT * len(clip)) * 1000:10.2f}"
+        print(row)
+
+
+def equivalence(clip):
+    ok = True
+    print("\nagainst gaussian: mean |diff| / min correlation")
+    for grid, cell in GRIDS:
+        for analysis_cell in (None, 4):
+            for sigma in MATCHED:
+                def grids(mode):
+                    analyzer = EdgeAnalyzer((WIDTH, HEIGHT), grid, cell, halo=sigma,
+                                            analysis_cell=analysis_cell, halo_mode=mode)
+                    return [analyzer(frame).copy() for frame in clip]
+
+                reference = grids("gaussian")
+                row = f"{str(grid):>11} k={str(analysis_cell):<4} sigma={sigma:<3}"
+                for mode, (max_diff, min_corr) in TOLERANCE.items():
+                    result = grids(mode)
+                    diff = np.mean([np.abs(a - b).mean() for a, b in zip(result, reference)])
+                    corr = min(np.corrcoef(a.ravel(), b.ravel())[0, 1]
+                               for a, b in zip(result, reference))
+                    passed = diff <= max_diff and corr >= min_corr
+                    ok &= passed
+                    row += f"  {mode} {diff:.3f} / {corr:.3f}{'' if passed else ' FAIL'}"
+                print(row)
+    return ok
+
+
+def main():
+    clip = frames()
+    timing(clip)
+    return 0 if equivalence(clip) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
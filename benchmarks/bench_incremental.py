@@ -0,0 +1,104 @@
+# Incremental analysis: tile change detection against the whole-frame chain
+#
+#   python -m benchmarks.bench_incremental
+#
+# Feeds synthetic camera clips (a static background with a figure moving
+# across it) through EdgeAnalyzer with and without incremental=True, for
+# each halo mode at full resolution and at analysis_cell 4.
+#
+# On a clean clip the incremental grids must match the full ones to
+# CLEAN_TOLERANCE. With sensor noise added they can't: the full chain's
+# edges flicker with the noise in static regions while the incremental
+# ones stay put, so that difference is only printed. The noisy clips are
+# also timed, and a static one must run at least MIN_STATIC_SPEEDUP times
+# faster wherever the full chain takes MIN_STATIC_MS or more; below that
+# it costs about as much as the camera frame's resize, which both pay.
+# Fails (exit 1) otherwise.
+
+import sys
+import time
+
+import numpy as np
+
+from matrix_rain import EdgeAnalyzer, SyntheticCapture
+from matrix_rain.analysis import HALO_MODES
+
+WIDTH, HEIGHT = 1920, 1080
+FRAMES = 60
+NOISE = 2.0                       # sensor noise, gray levels (std)
+
+# (preset-like grid, cell, halo) for per-column force and a full cell grid
+CASES = [((1, 60), (WIDTH // 60, None), 35), ((HEIGHT // 10, WIDTH // 10), (10, 10), 6)]
+
+# mean |diff| and 99.9th percentile |diff| of incremental grids against
+# full ones; 1/31 is one step of the 32-level brightness ramps
+CLEAN_TOLERANCE = (0.001, 1 / 31)
+MIN_STATIC_SPEEDUP = 1.5
+MIN_STATIC_MS = 2.0
+REPEAT = 3                        # timings are the best of this many fresh runs
+
+
+def clip(moving=True, noise=NOISE):
+    cap = SyntheticCapture(1280, 720, fps=None)
+    rng = np.random.default_rng(0)
+    frame = cap.read()[1]
+    frames = []
+    for _ in range(FRAMES):
+        if moving:
+            frame = cap.read()[1]
+        noisy = frame + rng.normal(0, noise, frame.shape) if noise else frame
+        frames.append(np.clip(noisy, 0, 255).astype(np.uint8))
+    return frames
+
+
+def run(analyzer, frames):
+    grids = []
+    start = time.perf_counter()
+    for frame in frames:
+        grids.append(analyzer(frame).copy())
+    return np.array(grids), (time.perf_counter() - start) / len(frames) * 1000
+
+
+def timed(make, frames):
+    return min(run(make(), frames)[1] for _ in range(REPEAT))
+
+
+def main():
+    clean, moving, static = clip(noise=0), clip(), clip(moving=False)
+    ok = True
+    print(f"{'':<28}{'full':>8}{'incr':>8}{'static':>8}{'incr':>8}"
+          f"   clean mean / p99.9   noisy mean")
+    for grid, cell, halo in CASES:
+        for analysis_cell in (None, 4):
+            for mode in HALO_MODES:
+                def analyzer(**kw):
+                    return EdgeAnalyzer((WIDTH, HEIGHT), grid, cell, canny=(40, 120),
+                                        halo=halo, halo_mode=mode,
+                                        analysis_cell=analysis_cell, **kw)
+
+                full = run(analyzer(), clean)[0]
+                diff = np.abs(run(analyzer(incremental=True), clean)[0] - full)
+                clean_mean, clean_tail = diff.mean(), np.percentile(diff, 99.9)
+
+                full = run(analyzer(), moving)[0]
+                noisy_mean = np.abs(run(analyzer(incremental=True), moving)[0] - full).mean()
+
+                def incremental():
+                    return analyzer(incremental=True)
+
+                full_ms, incr_ms = timed(analyzer, moving), timed(incremental, moving)
+                static_full_ms, static_ms = timed(analyzer, static), timed(incremental, static)
+
+                passed = (clean_mean <= CLEAN_TOLERANCE[0] and clean_tail <= CLEAN_TOLERANCE[1]
+                          and (static_full_ms < MIN_STATIC_MS
+                               or static_full_ms >= MIN_STATIC_SPEEDUP * static_ms))
+                ok &= passed
+                name = f"{str(grid)} k={analysis_cell} {mode}"
+                print(f"{name:<28}{full_ms:8.2f}{incr_ms:8.2f}{static_full_ms:8.2f}{static_ms:8.2f}"
+                      f"   {clean_mean:10.4f} / {clean_tail:.3f}   {noisy_mean:10.4f}"
+                      f"{'' if passed else '  FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
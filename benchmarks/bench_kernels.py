@@ -0,0 +1,145 @@
+# NumPy vs. Numba kernels: identical output, and how long each takes
+#
+#   python -m benchmarks.bench_kernels
+#   python -m benchmarks.bench_kernels --size 1280x720 --frames 60
+#
+# Times every kernel in matrix_rain.kernels on 1920x1080-sized inputs
+# with each backend, then renders the grid and trail presets through
+# OfflineRender (incremental analysis included) once per backend.
+# Fails (exit 1) if the backends differ in any kernel output or rendered
+# frame. The first call of the last backend is shown apart: for numba
+# it includes compiling, or loading the compiled kernel from the cache.
+# Without numba installed only the numpy backend is timed.
+
+import argparse
+import hashlib
+import sys
+import time
+import timeit
+
+import numpy as np
+import pygame
+
+from matrix_rain import GridCompositor, OfflineRender, PRESETS, SyntheticCapture, kernels
+from matrix_rain.compositor import green_lut
+from matrix_rain.glyphs import MATRIX, get_atlas
+from matrix_rain.sampling import spans
+
+WIDTH, HEIGHT = 1920, 1080
+CELL = 14                         # uneven: 137 x 77 cells, remainders spread
+REPEAT = 20
+WARMUP = 5                        # render frames left out of fps (numba compiles here)
+
+
+def inputs(rng):
+    rows, cols = HEIGHT // CELL, WIDTH // CELL
+    field = rng.random((HEIGHT, WIDTH), dtype=np.float32)
+    gray = rng.integers(0, 256, (HEIGHT, WIDTH), dtype=np.uint8)
+    ys, xs = spans(HEIGHT, rows), spans(WIDTH, cols)
+    grid = rng.random((rows, cols), dtype=np.float32)
+    heads = rng.uniform(0, rows, cols)
+    lengths = rng.integers(5, rows, cols)
+    return rows, cols, field, gray, ys, xs, grid, heads, lengths
+
+
+def kernel_runs(rng):
+    rows, cols, field, gray, ys, xs, grid, heads, lengths = inputs(rng)
+    pygame.font.init()
+    atlas = get_atlas("Consolas", CELL, MATRIX, bold=True)
+    compositors = {fade: GridCompositor(atlas, rows, cols, (CELL, CELL), green_lut(), fade=fade)
+                   for fade in (0.0, 0.1)}
+    glyphs = rng.integers(0, len(MATRIX), (rows, cols))
+    levels = rng.integers(0, 32, (rows, cols))
+    means = np.empty((rows, cols), np.float32)
+    trail = np.empty((rows, cols), np.intp)
+    scratch = np.empty((rows, cols), np.float32)
+
+    def compose(fade):
+        compositor = compositors[fade]
+        compositor.frame[...] = 200
+        return compositor.compose(glyphs, levels)
+
+    return {
+        "cell_means f32": lambda: kernels.cell_means(field, ys, xs, means),
+        "cell_means u8": lambda: kernels.cell_means(gray, ys, xs, means),
+        "trail_levels": lambda: kernels.trail_levels(grid, heads, lengths, 0.4, 31, trail, scratch),
+        "composite": lambda: compose(0.0),
+        "composite fade": lambda: compose(0.1),
+    }
+
+
+def render(name, size, frames, **overrides):
+    digest = hashlib.sha1()
+    job = OfflineRender(name, SyntheticCapture(*size, fps=None), None, size, seed=0,
+                        **overrides).open()
+    start = None
+    try:
+        while job.frames < WARMUP + frames and job.step():
+            digest.update(job.frame)
+            if job.frames == WARMUP:
+                start = time.perf_counter()
+    finally:
+        job.close()
+    return digest.hexdigest(), frames / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_kernels")
+    parser.add_argument("--size", default="1920x1080", help="render size as WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=90)
+    args = parser.parse_args(argv)
+    w, h = args.size.lower().split("x")
+    size = (int(w), int(h))
+
+    backends = [name for name in kernels.BACKENDS if name != "numba" or kernels.numba]
+    if "numba" not in backends:
+        print("numba is not installed: timing the numpy backend only\n")
+    default = kernels.backend
+
+    ok = True
+    outputs = {}
+    times = {}
+    for backend in backends:
+        kernels.use(backend)
+        runs = kernel_runs(np.random.default_rng(0))
+        for name, run in runs.items():
+            start = time.perf_counter()
+            result = run()
+            first = time.perf_counter() - start
+            outputs.setdefault(name, []).append(result.copy())
+            best = min(timeit.repeat(run, number=1, repeat=REPEAT))
+            times.setdefault(name, []).append((best, first))
+
+    print(f"{'kernel':<16}" + "".join(f"{b + ' ms':>12}" for b in backends)
+          + f"{backends[-1] + ' 1st ms':>15}  same")
+    for name, results in outputs.items():
+        same = all(np.array_equal(results[0], other) for other in results[1:])
+        ok &= same
+        best = "".join(f"{t * 1000:12.2f}" for t, _ in times[name])
+        first = times[name][-1][1] * 1000
+        print(f"{name:<16}{best}{first:15.1f}  {'yes' if same else 'NO  FAIL'}")
+
+    print(f"\nrenders at {size[0]}x{size[1]}, {args.frames} frames")
+    print(f"{'preset':<22}" + "".join(f"{b + ' fps':>12}" for b in backends) + "  same")
+    for name, config in PRESETS.items():
+        if config["scene"] == "streams":
+            continue
+        for label, overrides in (("", {}),
+                                 (" incremental", {"analysis": dict(config["analysis"],
+                                                                    incremental=True)})):
+            digests = []
+            rates = ""
+            for backend in backends:
+                kernels.use(backend)
+                digest, fps = render(name, size, args.frames, **overrides)
+                digests.append(digest)
+                rates += f"{fps:12.1f}"
+            same = len(set(digests)) == 1
+            ok &= same
+            print(f"{name + label:<22}{rates}  {'yes' if same else 'NO  FAIL'}")
+    kernels.use(default)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
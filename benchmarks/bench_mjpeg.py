@@ -0,0 +1,251 @@
+# MJPEG over HTTP: encode once for every client, slow clients don't hold anyone up
+#
+#   python -m benchmarks.bench_mjpeg
+#   python -m benchmarks.bench_mjpeg --clients 8 --seconds 5 --size 1920x1080
+#
+# Renders a preset offline from the synthetic camera, then publishes its
+# frames to an MjpegServer on localhost at PUBLISH_FPS while --clients
+# clients read the stream as fast as they can and one more reads a frame
+# every SLOW_INTERVAL seconds. Checks that
+#
+#   - each frame is encoded once, not once per client, and every client
+#     was sent the same JPEG bytes for it
+#   - the slow client is skipped ahead instead of queueing frames, and the
+#     fast clients still get most of them
+#   - publish() costs the same (median) with the slow client connected
+#     as with only fast ones, so a client can't slow the render loop down
+#   - the JPEGs decode to the published frames, /frame.jpg serves one and
+#     an unknown path is a 404
+#
+# and finally streams a headless Engine run (Engine(serve=0)), where a
+# green preset must come out green, i.e. the display's RGB is sent as BGR.
+# Fails (exit 1) if any check fails.
+
+import argparse
+import hashlib
+import os
+import socket
+import sys
+import threading
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import cv2
+import numpy as np
+
+from matrix_rain import Engine, MjpegServer, OfflineRender, SyntheticCapture
+
+PUBLISH_FPS = 60
+SLOW_INTERVAL = 0.25
+RENDER_FRAMES = 30
+MIN_FAST_SHARE = 0.5              # of the encoded frames each fast client must get
+MAX_PUBLISH_SLOWDOWN = 2.0        # publish() p50 with a slow client vs. without
+MAX_MEAN_ERROR = 8.0              # gray levels between a frame and its decoded JPEG
+
+
+def request(port, path, rcvbuf=None):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    if rcvbuf:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+    sock.settimeout(5.0)
+    sock.connect(("127.0.0.1", port))
+    sock.sendall(f"GET {path} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    stream = sock.makefile("rb")
+    status = stream.readline().split(b" ", 2)[1]
+    headers = {}
+    for line in iter(stream.readline, b"\r\n"):
+        name, _, value = line.decode().partition(":")
+        headers[name.lower()] = value.strip()
+    return sock, stream, int(status), headers
+
+
+def read_part(stream):
+    if stream.readline().strip() != b"--frame":
+        raise ValueError("not at a part boundary")
+    length = None
+    for line in iter(stream.readline, b"\r\n"):
+        name, _, value = line.decode().partition(":")
+        if name.lower() == "content-length":
+            length = int(value)
+    data = stream.read(length)
+    stream.readline()
+    return data
+
+
+class Client(threading.Thread):
+    """Reads a stream, keeping a digest of every JPEG and the last one."""
+
+    def __init__(self, port, interval=None):
+        super().__init__(daemon=True)
+        self.port = port
+        self.interval = interval
+        self.digests = []
+        self.last = None
+        self.running = True
+        # a small receive buffer so a slow reader's socket fills up quickly
+        self.sock, self.stream, self.status, self.headers = request(
+            port, "/stream.mjpg", 65536 if interval else None)
+
+    def run(self):
+        try:
+            while self.running:
+                data = read_part(self.stream)
+                self.digests.append(hashlib.sha1(data).hexdigest())
+                self.last = data
+                if self.interval:
+                    time.sleep(self.interval)
+        except (OSError, ValueError):
+            pass
+
+    def close(self):
+        self.running = False
+        self.sock.shutdown(socket.SHUT_RDWR)
+        self.sock.close()
+        self.join(timeout=2.0)
+
+
+def rendered(preset, size):
+    job = OfflineRender(preset, SyntheticCapture(*size, fps=None), None, size, fps=30,
+                        seed=0).open()
+    frames = []
+    try:
+        while len(frames) < RENDER_FRAMES and job.step():
+            frames.append(job.frame.copy())
+    finally:
+        job.close()
+    return frames
+
+
+def publish_for(server, frames, seconds):
+    """publish() at PUBLISH_FPS; returns (frames taken, publish() ms p50, p99)."""
+    costs = []
+    taken = 0
+    start = time.perf_counter()
+    n = 0
+    while time.perf_counter() - start < seconds:
+        before = time.perf_counter()
+        taken += server.publish(frames[n % len(frames)])
+        costs.append((time.perf_counter() - before) * 1000.0)
+        n += 1
+        time.sleep(max(0.0, start + n / PUBLISH_FPS - time.perf_counter()))
+    return (taken,) + tuple(np.percentile(costs, (50, 99)))
+
+
+def wait_for_clients(server, count):
+    end = time.perf_counter() + 2.0
+    while server.clients < count and time.perf_counter() < end:
+        time.sleep(0.01)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_mjpeg")
+    parser.add_argument("preset", nargs="?", default="attempt8")
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--clients", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args(argv)
+    w, h = args.size.lower().split("x")
+    size = (int(w), int(h))
+    frames = rendered(args.preset, size)
+    failures = []
+
+    with MjpegServer(port=0, fps=None) as server:
+        # ---- fast clients only ----
+        fast = [Client(server.port) for _ in range(args.clients)]
+        for client in fast:
+            client.start()
+        wait_for_clients(server, len(fast))
+        _, alone_p50, alone_p99 = publish_for(server, frames, args.seconds)
+        for client in fast:
+            client.close()
+
+        # ---- the same with a slow client ----
+        wait_for_clients(server, 0)
+        encoded, sent = server.frames, server.sent
+        fast = [Client(server.port) for _ in range(args.clients)]
+        slow = Client(server.port, SLOW_INTERVAL)
+        for client in fast + [slow]:
+            client.start()
+        wait_for_clients(server, len(fast) + 1)
+        taken, p50, p99 = publish_for(server, frames, args.seconds)
+        time.sleep(0.2)
+        encoded, sent = server.frames - encoded, server.sent - sent
+        got = [len(client.digests) for client in fast + [slow]]
+        for client in fast + [slow]:
+            client.close()
+
+        print(f"{size[0]}x{size[1]} {args.preset}, {args.clients} fast clients + 1 reading "
+              f"every {SLOW_INTERVAL}s, publishing at {PUBLISH_FPS} fps for {args.seconds}s")
+        print(f"  publish()  p50 {p50:.3f} ms  p99 {p99:.3f} ms "
+              f"(p50 {alone_p50:.3f} ms, p99 {alone_p99:.3f} ms with only fast clients)")
+        print(f"  encoded {encoded} of {taken} frames taken, last in {server.encode_ms:.1f} ms; "
+              f"{sent} JPEGs sent")
+        print(f"  fast clients got {', '.join(map(str, got[:-1]))}; "
+              f"the slow one {got[-1]}; {server.dropped} skipped in all")
+
+        if encoded > taken:
+            failures.append("more frames encoded than published")
+        seen = {}
+        for client in fast + [slow]:
+            for digest in client.digests:
+                seen.setdefault(digest, set()).add(id(client))
+        if len(seen) > encoded:
+            failures.append(f"{len(seen)} different JPEGs sent for {encoded} frames encoded")
+        if min(got[:-1]) < MIN_FAST_SHARE * encoded:
+            failures.append("a fast client fell behind with the slow one connected")
+        if got[-1] > args.seconds / SLOW_INTERVAL + 2 or not server.dropped:
+            failures.append("the slow client wasn't skipped ahead")
+        if p50 > MAX_PUBLISH_SLOWDOWN * alone_p50 + 0.5:
+            failures.append("publish() got slower with a slow client connected")
+
+        # ---- what comes out ----
+        image = cv2.imdecode(np.frombuffer(fast[0].last, np.uint8), cv2.IMREAD_COLOR)
+        errors = [np.abs(image.astype(np.int16) - f).mean() for f in frames
+                  if f.shape == image.shape]
+        if not errors or min(errors) > MAX_MEAN_ERROR:
+            failures.append("streamed JPEG doesn't match any published frame")
+
+        def fetch():
+            time.sleep(0.2)
+            server.publish(frames[0])
+        threading.Thread(target=fetch, daemon=True).start()
+        sock, stream, status, headers = request(server.port, "/frame.jpg")
+        data = stream.read(int(headers.get("content-length", 0)))
+        sock.close()
+        if status != 200 or cv2.imdecode(np.frombuffer(data, np.uint8), 1) is None:
+            failures.append(f"/frame.jpg answered {status}")
+        sock, _, status, _ = request(server.port, "/nothing")
+        sock.close()
+        if status != 404:
+            failures.append(f"an unknown path answered {status}, not 404")
+
+    # ---- a live Engine run ----
+    engine = Engine(args.preset, size, capture=SyntheticCapture(*size), fps=60, serve=0).open()
+    try:
+        viewer = Client(engine.server.port)
+        viewer.start()
+        while engine.frames < 120 and engine.step():
+            pass
+        viewer.close()
+    finally:
+        engine.close()
+    if viewer.last is None:
+        failures.append("nothing streamed from the Engine")
+    else:
+        image = cv2.imdecode(np.frombuffer(viewer.last, np.uint8), cv2.IMREAD_COLOR)
+        b, g, r = image.reshape(-1, 3).mean(axis=0)
+        print(f"  Engine stream: {len(viewer.digests)} frames of {image.shape[1]}x"
+              f"{image.shape[0]}, mean BGR {b:.1f} {g:.1f} {r:.1f}")
+        if image.shape[:2] != (size[1], size[0]) or not g > max(b, r):
+            failures.append("the Engine's stream has the wrong size or colours")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,210 @@
+# Several cameras at once: tiled and merged grids, and analysis throughput
+#
+#   python -m benchmarks.bench_multicam
+#   python -m benchmarks.bench_multicam attempt6 --cameras 4 --seconds 5
+#
+# Opens the Engine headless on several synthetic cameras, each showing its
+# figure from a different seed, in both camera layouts and checks that
+#
+#   - "tile" splits the grid's columns into one band per camera (as
+#     sampling.spans does) and the combined grid is each camera's own
+#     analysis, side by side
+#   - "merge" analyses every camera over the whole grid exactly as a
+#     one-camera Engine would and the combined grid is their maximum
+#   - a live run gives every camera its own capture and analysis thread,
+#     and each one delivers analyses
+#
+# Then it times edge analysis of 1, 2, ... cameras two ways: one
+# AnalysisClock thread per camera, as the Engine runs them, and one loop
+# analysing the cameras in turn. Only the first scales with cores, so
+# the speedup printed is bounded by the CPU count printed with it.
+# Fails (exit 1) if any check fails.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from matrix_rain import EdgeAnalyzer, Engine, Frame, LatestFrameReader, SyntheticCapture
+from matrix_rain.sampling import spans
+from matrix_rain.scheduler import AnalysisClock, MultiClock
+
+SIZE = (1280, 720)
+RUN_FRAMES = 120
+
+
+class StillReader:
+    """Stands in for a LatestFrameReader that always has the one frame."""
+
+    def __init__(self, image):
+        self.frame = Frame(image, time.perf_counter(), 1)
+
+    def latest(self):
+        return self.frame
+
+    def wait(self, after_seq=0, timeout=None):
+        return self.frame
+
+
+def frames(count):
+    return [SyntheticCapture(*SIZE, fps=None, seed=k).read()[1] for k in range(count)]
+
+
+def check_layout(preset, count, layout):
+    failures = []
+    engine = Engine(preset, SIZE, capture=[SyntheticCapture(*SIZE, seed=k) for k in range(count)],
+                    fps=None, camera_layout=layout).open()
+    try:
+        rows, cols = engine.scene.grid
+        analyzers = [clock.analyzer for clock in engine.analyses]
+        columns = engine.analysis.columns
+        if layout == "tile":
+            if columns is None or list(columns) != list(spans(cols, count)):
+                failures.append(f"tile bands {columns} are not spans({cols}, {count})")
+                return failures
+            for k, analyzer in enumerate(analyzers):
+                band = columns[k + 1] - columns[k]
+                if analyzer.grid != (rows, band) or analyzer.size[0] != band * engine.scene.cell[0]:
+                    failures.append(f"camera {k} analyses {analyzer.grid} over {analyzer.size}")
+        else:
+            single = Engine(preset, SIZE, capture=SyntheticCapture(*SIZE), fps=None).open()
+            reference = single.analyzer
+            single.close()
+            if columns is not None:
+                failures.append("merge layout tiles the cameras")
+            for k, analyzer in enumerate(analyzers):
+                if (analyzer.grid, analyzer.size, analyzer.analysis_size) != (
+                        reference.grid, reference.size, reference.analysis_size):
+                    failures.append(f"camera {k} isn't analysed like a single camera")
+    finally:
+        engine.close()
+    if failures:
+        return failures
+
+    # the combined grid against each camera's analysis on its own
+    for analyzer in analyzers:
+        analyzer.timer = None
+    images = frames(count)
+    expected = [analyzer(image).copy() for analyzer, image in zip(analyzers, images)]
+    clocks = [AnalysisClock(analyzer, StillReader(image), blend=None, threaded=False)
+              for analyzer, image in zip(analyzers, images)]
+    combined = MultiClock(clocks, (rows, cols), columns).sample()
+    if layout == "tile":
+        expected = np.hstack(expected)
+    else:
+        expected = np.maximum.reduce(expected)
+    if combined is None or not np.array_equal(combined, expected):
+        failures.append(f"{layout}: combined grid differs from the cameras' own analyses")
+    return failures
+
+
+def check_run(preset, count):
+    path = os.path.join(tempfile.mkdtemp(), "trace.json")
+    engine = Engine(preset, SIZE, capture=[SyntheticCapture(*SIZE, seed=k) for k in range(count)],
+                    fps=60, trace=path)
+    start = time.perf_counter()
+    engine.run(RUN_FRAMES)
+    elapsed = time.perf_counter() - start
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    os.remove(path)
+    threads = {e["args"]["name"] for e in events if e["ph"] == "M"}
+    failures = []
+    for k, clock in enumerate(engine.analyses):
+        if not clock.results:
+            failures.append(f"camera {k} was never analysed")
+        for name in (f"capture {k}", f"analysis {k}"):
+            if name not in threads:
+                failures.append(f"no {name!r} thread in the trace")
+    rates = "  ".join(f"{clock.results / elapsed:.1f}" for clock in engine.analyses)
+    print(f"  live run, {count} cameras tiled: {RUN_FRAMES / elapsed:.1f} fps, "
+          f"analyses/s per camera {rates}")
+    return failures
+
+
+def threaded(analyzers, readers, seconds):
+    clocks = [AnalysisClock(analyzer, reader, blend=None) for analyzer, reader in
+              zip(analyzers, readers)]
+    for clock in clocks:
+        clock.start()
+    time.sleep(seconds)
+    for clock in clocks:
+        clock.stop()
+    return sum(clock.results for clock in clocks) / seconds
+
+
+def serial(analyzers, readers, seconds):
+    done = 0
+    seen = [0] * len(readers)
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        for k, (analyzer, reader) in enumerate(zip(analyzers, readers)):
+            frame = reader.wait(after_seq=seen[k], timeout=0.1)
+            if frame is None:
+                continue
+            seen[k] = frame.seq
+            analyzer(frame.image)
+            done += 1
+    return done / seconds
+
+
+def throughput(count, seconds, grid, cell):
+    readers = [LatestFrameReader(SyntheticCapture(*SIZE, fps=30, seed=k), f"capture {k}")
+               for k in range(count)]
+    for reader in readers:
+        reader.start()
+    try:
+        rates = {}
+        for label, run in (("serial", serial), ("threaded", threaded)):
+            analyzers = [EdgeAnalyzer(SIZE, grid, cell, analysis_cell=None, halo=6)
+                         for _ in range(count)]
+            rates[label] = run(analyzers, readers, seconds)
+    finally:
+        for reader in readers:
+            reader.stop()
+    return rates
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_multicam")
+    parser.add_argument("preset", nargs="?", default="attempt8")
+    parser.add_argument("--cameras", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args(argv)
+    if args.cameras < 2:
+        parser.error("--cameras must be at least 2")
+
+    failures = []
+    for layout in ("tile", "merge"):
+        problems = check_layout(args.preset, args.cameras, layout)
+        print(f"  {args.preset}, {args.cameras} cameras, {layout}: "
+              f"{'ok' if not problems else 'FAILED'}")
+        failures += problems
+    failures += check_run(args.preset, args.cameras)
+
+    # full-resolution analysis at 30 fps per camera, so there is work to spread
+    cell = (8, 8)
+    grid = (SIZE[1] // cell[1], SIZE[0] // cell[0])
+    print(f"full-resolution analysis of {SIZE[0]}x{SIZE[1]} cameras at 30 fps, "
+          f"{os.cpu_count()} CPUs: analyses/s")
+    print(f"{'cameras':>8}{'serial':>10}{'threaded':>10}{'speedup':>9}")
+    for count in range(1, args.cameras + 1):
+        rates = throughput(count, args.seconds, grid, cell)
+        print(f"{count:8d}{rates['serial']:10.1f}{rates['threaded']:10.1f}"
+              f"{rates['threaded'] / max(rates['serial'], 1e-9):9.2f}")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+# Segment-parallel offline render: scaling with worker count
+#
+#   python -m benchmarks.bench_parallel
+#   python -m benchmarks.bench_parallel --preset attempt8 --size 1920x1080 --frames 900
+#
+# Records a synthetic clip, then renders it with render_parallel for
+# 1, 2, 4, ... workers up to the core count and prints the speedup over
+# one worker. Fails (exit 1) if a render is missing frames or if two
+# renders with the same seed and worker count differ.
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import cv2
+
+from matrix_rain import SyntheticCapture, render_parallel
+
+
+def digest(pattern, count):
+    sha = hashlib.sha1()
+    for i in range(count):
+        with open(pattern % i, "rb") as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_parallel")
+    parser.add_argument("--preset", default="attempt8")
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=float, default=3.0)
+    args = parser.parse_args(argv)
+    w, h = args.size.lower().split("x")
+    size = (int(w), int(h))
+
+    counts = [1]
+    while counts[-1] * 2 <= (os.cpu_count() or 1):
+        counts.append(counts[-1] * 2)
+
+    ok = True
+    with tempfile.TemporaryDirectory() as folder:
+        clip = os.path.join(folder, "clip.avi")
+        camera = SyntheticCapture(*size, fps=None)
+        writer = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*"MJPG"), 30, size)
+        for _ in range(args.frames):
+            writer.write(camera.read()[1])
+        writer.release()
+        print(f"{args.preset} {args.size}, {args.frames} frames, warmup {args.warmup} s")
+        print(f"{'workers':>8}{'seconds':>10}{'fps':>8}{'speedup':>9}")
+        base = None
+        for workers in counts:
+            out = os.path.join(folder, f"out{workers}.mp4")
+            start = time.perf_counter()
+            written = render_parallel(args.preset, clip, out, workers, warmup=args.warmup)
+            seconds = time.perf_counter() - start
+            base = base or seconds
+            capture = cv2.VideoCapture(out)
+            decoded = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+            capture.release()
+            complete = written == decoded == args.frames
+            ok &= complete
+            print(f"{workers:>8}{seconds:10.2f}{args.frames / seconds:8.1f}{base / seconds:9.2f}"
+                  f"{'' if complete else f'  FAIL: {written} written, {decoded} in file'}")
+
+        # same seed and split, same images
+        workers = counts[-1]
+        frames = min(args.frames, 60)
+        runs = []
+        for run in "ab":
+            pattern = os.path.join(folder, run, "%04d.png")
+            render_parallel(args.preset, clip, pattern, workers, warmup=args.warmup)
+            runs.append(digest(pattern, frames))
+        same = runs[0] == runs[1]
+        ok &= same
+        print(f"reproducible with {workers} workers: {'yes' if same else 'NO  FAIL'}")
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+# Recording and memmap replay: exact frames, original pace, and what a frame costs
+#
+#   python -m benchmarks.bench_replay
+#   python -m benchmarks.bench_replay --size 1920x1080 --frames 300
+#
+# Records the synthetic camera through RecordingCapture into a ring
+# smaller than the run, then checks that MemmapCapture gives back the
+# last `capacity` frames exactly, in order, as read-only views into the
+# file. Prints what a frame costs to record, to replay, and to decode
+# from an MJPG clip of the same frames, then replays a 30 fps recording
+# at its recorded pace and reports how far the intervals drift. Last, a
+# preset rendered from the recording must match the same preset rendered
+# from the synthetic camera frame for frame. Fails (exit 1) on any
+# mismatch or if paced replay is off by more than PACE_TOLERANCE.
+
+import argparse
+import hashlib
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import cv2
+import numpy as np
+
+from matrix_rain import OfflineRender, SyntheticCapture
+from matrix_rain.recording import MemmapCapture, RecordingCapture
+from matrix_rain.sources import LoopingFileCapture
+
+PACED_FRAMES = 45
+PACE_TOLERANCE = 0.002            # seconds of mean interval error allowed
+RENDER_FRAMES = 60
+
+
+def per_frame(read, count):
+    start = time.perf_counter()
+    for _ in range(count):
+        read()
+    return (time.perf_counter() - start) / count * 1000
+
+
+def render(preset, source, size, frames):
+    digest = hashlib.sha1()
+    job = OfflineRender(preset, source, None, size, fps=30, seed=0).open()
+    try:
+        while job.frames < frames and job.step():
+            digest.update(job.frame)
+    finally:
+        job.close()
+    return digest.hexdigest(), job.frames
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_replay")
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--frames", type=int, default=150)
+    parser.add_argument("--capacity", type=int, default=100)
+    parser.add_argument("--preset", default="attempt8")
+    args = parser.parse_args(argv)
+    w, h = args.size.lower().split("x")
+    size = (int(w), int(h))
+    folder = tempfile.mkdtemp()
+    failures = []
+    try:
+        # ---- record, wrapping the ring ----
+        path = os.path.join(folder, "run.npy")
+        original = []
+        recorder = RecordingCapture(SyntheticCapture(*size, fps=None), path, args.capacity)
+        recording = per_frame(lambda: original.append(recorder.read()[1]), args.frames)
+        recorder.release()
+        plain = SyntheticCapture(*size, fps=None)
+        synthetic = per_frame(plain.read, args.frames)
+
+        replay = MemmapCapture(path, fps=None, loop=False)
+        kept = []
+        ok, image = replay.read()
+        while ok:
+            kept.append(image)
+            ok, image = replay.read()
+        if len(kept) != args.capacity or not all(
+                np.array_equal(a, b) for a, b in zip(original[-args.capacity:], kept)):
+            failures.append("replayed frames differ from the last ones recorded")
+        if not all(isinstance(image, np.memmap) and not image.flags.writeable for image in kept):
+            failures.append("replay handed out copies, not read-only views into the file")
+        del kept, original
+
+        # ---- what a frame costs ----
+        clip = os.path.join(folder, "run.avi")
+        writer = cv2.VideoWriter(clip, cv2.VideoWriter_fourcc(*"MJPG"), 30, size)
+        source = MemmapCapture(path, fps=None, loop=False)
+        ok, image = source.read()
+        while ok:
+            writer.write(np.ascontiguousarray(image))
+            ok, image = source.read()
+        writer.release()
+        replay = MemmapCapture(path, fps=None)
+        decode = LoopingFileCapture(clip, fps=None)
+        print(f"{size[0]}x{size[1]}, {args.frames} frames into a ring of {args.capacity}")
+        print(f"  record     {recording - synthetic:7.3f} ms/frame on top of the source")
+        print(f"  replay     {per_frame(replay.read, args.frames):7.3f} ms/frame (memmap view)")
+        print(f"  decode     {per_frame(decode.read, args.frames):7.3f} ms/frame (MJPG clip)")
+        decode.release()
+
+        # ---- recorded pace ----
+        paced = os.path.join(folder, "paced.npy")
+        recorder = RecordingCapture(SyntheticCapture(*size, fps=30), paced, PACED_FRAMES)
+        for _ in range(PACED_FRAMES):
+            recorder.read()
+        recorder.release()
+        replay = MemmapCapture(paced, loop=False)
+        stamps = []
+        while replay.read()[0]:
+            stamps.append(time.perf_counter())
+        error = np.abs(np.diff(stamps) - np.diff(replay.times))
+        print(f"  paced replay at {replay.recorded_fps:.1f} fps: interval error "
+              f"mean {error.mean() * 1000:.2f} ms, max {error.max() * 1000:.2f} ms")
+        if error.mean() > PACE_TOLERANCE:
+            failures.append("paced replay drifts from the recorded intervals")
+
+        # ---- drop-in: the same render from the recording as from the camera ----
+        direct = os.path.join(folder, "direct.npy")
+        recorder = RecordingCapture(SyntheticCapture(*size, fps=None), direct, RENDER_FRAMES)
+        live = render(args.preset, recorder, size, RENDER_FRAMES)
+        recorder.release()
+        replayed = render(args.preset, direct, size, RENDER_FRAMES)
+        print(f"  {args.preset} rendered from the camera and from its recording: "
+              f"{'same' if live == replayed else 'DIFFERENT'}")
+        if live != replayed:
+            failures.append("rendering from the recording differs from rendering live")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,95 @@
+# Batched numpy randomness vs. the per-cell Python RNG calls in the attempt scripts
+#
+#   python -m benchmarks.bench_rng
+#
+# Times glyph mutation over attempt3's stream arrays at 1920x1080 and
+# building a full glyph grid, then replays seeded StreamRain runs.
+# Fails (exit 1) if two runs with the same seed differ.
+
+import hashlib
+import random
+import sys
+import timeit
+
+import numpy as np
+
+from matrix_rain import PRESETS, StreamRain
+from matrix_rain.glyphs import MATRIX
+
+WIDTH, HEIGHT = 1920, 1080
+GLYPH = 16
+CELL = 8
+FRAMES = 300
+REPEAT = 20
+
+
+def loop_mutate(glyphs, lengths, p, count):
+    # attempt3 / myTest2: a random() per visible cell, randint on a hit
+    for s, length in enumerate(lengths):
+        row = glyphs[s]
+        for j in range(length):
+            if random.random() < p:
+                row[j] = random.randint(0, count - 1)
+
+
+def mask_mutate(rng, glyphs, p, count):
+    # one uniform draw per cell, as a boolean mask
+    swap = rng.random(glyphs.shape) < p
+    glyphs[swap] = rng.integers(0, count, np.count_nonzero(swap))
+
+
+def batched_mutate(rng, glyphs, p, count):
+    # StreamRain: how many swap, then which
+    n = rng.binomial(glyphs.size, p)
+    swap = rng.choice(glyphs.size, n, replace=False, shuffle=False)
+    glyphs.reshape(-1)[swap] = rng.integers(0, count, n)
+
+
+def replay(config, seed):
+    columns = WIDTH // GLYPH
+    rain = StreamRain(columns, GLYPH, GLYPH, HEIGHT, len(MATRIX), seed=seed,
+                      capacity=columns * config["capacity"], **config["rain"])
+    force = np.linspace(0, 1, columns, dtype=np.float32)
+    digest = hashlib.sha1()
+    for _ in range(FRAMES):
+        rain.update(force)
+        for array in rain.trail():
+            digest.update(array)
+    return digest.hexdigest()
+
+
+def main():
+    config = PRESETS["attempt3"]
+    rng = np.random.default_rng(0)
+    columns = WIDTH // GLYPH
+    lo, hi = config["rain"]["length"]
+    # a screenful of streams, as in attempt3 after its first few seconds
+    glyphs = rng.integers(0, len(MATRIX), (columns * config["capacity"], hi)).astype(np.int32)
+    lengths = rng.integers(lo, hi + 1, columns * 8).tolist()
+    p = config["rain"]["mutate"]
+
+    print(f"glyph mutation, {len(lengths)} live streams, p={p:.3f}, ms per frame")
+    for name, fn in [
+        ("per-cell random()", lambda: loop_mutate(glyphs, lengths, p, len(MATRIX))),
+        ("mask over arrays", lambda: mask_mutate(rng, glyphs, p, len(MATRIX))),
+        ("binomial + choice", lambda: batched_mutate(rng, glyphs, p, len(MATRIX))),
+    ]:
+        print(f"  {name:<20}{min(timeit.repeat(fn, number=1, repeat=REPEAT)) * 1000:8.3f}")
+
+    rows, cols = HEIGHT // CELL, WIDTH // CELL
+    weighted = np.arange(len(MATRIX))
+    print(f"glyph grid {rows}x{cols}, ms")
+    for name, fn in [
+        ("nested choice()", lambda: [[random.choice(MATRIX) for _ in range(cols)]
+                                     for _ in range(rows)]),
+        ("rng.choice", lambda: rng.choice(weighted, (rows, cols))),
+    ]:
+        print(f"  {name:<20}{min(timeit.repeat(fn, number=1, repeat=REPEAT)) * 1000:8.3f}")
+
+    same = replay(config, 0) == replay(config, 0)
+    print(f"seeded StreamRain replays {FRAMES} frames: {'identical' if same else 'DIFFER  FAIL'}")
+    return 0 if same else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# Vectorized cell/column sampling vs. the per-cell loops in the attempt scripts
+#
+#   python -m benchmarks.bench_sampling
+
+import timeit
+
+import numpy as np
+
+from matrix_rain.sampling import cell_grid, column_profile
+
+RESOLUTIONS = [(800, 600), (1920, 1080)]
+CELL_SIZE = 10
+NUM_COLUMNS = 60
+REPEAT = 5
+
+
+def loop_grid(halo, rows, cols):
+    # attempt6 / myTest
+    height, width = halo.shape
+    brightness = np.zeros((rows, cols), dtype=np.float32)
+    for r in range(rows):
+        y0 = int(r * CELL_SIZE)
+        y1 = min(y0 + CELL_SIZE, height)
+        for c in range(cols):
+            x0 = int(c * CELL_SIZE)
+            x1 = min(x0 + CELL_SIZE, width)
+            brightness[r, c] = np.mean(halo[y0:y1, x0:x1])
+    return brightness
+
+
+def loop_columns(halo, cols):
+    # attempt4 / attempt5 / attempt7
+    col_w = halo.shape[1] // cols
+    force = []
+    for i in range(cols):
+        x0 = i * col_w
+        x1 = x0 + col_w
+        force.append(np.mean(halo[:, x0:x1]))
+    return np.array(force, dtype=np.float32)
+
+
+def best_of(fn):
+    number = 3
+    return min(timeit.repeat(fn, number=number, repeat=REPEAT)) / number * 1000
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'size':>10} {'kernel':>8} {'loop ms':>9} {'vector ms':>10} {'speedup':>8}")
+
+    for width, height in RESOLUTIONS:
+        halo = rng.random((height, width), dtype=np.float32)
+        rows = height // CELL_SIZE
+        cols = width // CELL_SIZE
+        col_w = width // NUM_COLUMNS
+
+        assert np.allclose(loop_grid(halo, rows, cols),
+                           cell_grid(halo, rows, cols, CELL_SIZE, CELL_SIZE), atol=1e-5)
+        assert np.allclose(loop_columns(halo, NUM_COLUMNS),
+                           column_profile(halo, NUM_COLUMNS, col_w), atol=1e-5)
+
+        cases = [
+            ("grid", lambda: loop_grid(halo, rows, cols),
+                     lambda: cell_grid(halo, rows, cols, CELL_SIZE, CELL_SIZE)),
+            ("columns", lambda: loop_columns(halo, NUM_COLUMNS),
+                        lambda: column_profile(halo, NUM_COLUMNS, col_w)),
+        ]
+        for name, loop, vector in cases:
+            t_loop = best_of(loop)
+            t_vec = best_of(vector)
+            print(f"{width}x{height:<5} {name:>8} {t_loop:9.2f} {t_vec:10.3f} {t_loop / t_vec:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
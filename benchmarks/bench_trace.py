@@ -0,0 +1,114 @@
+# Latency tracing against the synthetic camera: a consistent trace, and its cost
+#
+#   python -m benchmarks.bench_trace
+#   python -m benchmarks.bench_trace attempt6 --frames 600 --out trace.json
+#
+# Runs a preset headless through the Engine on SyntheticCapture with
+# tracing on, then checks the Chrome trace it wrote against the run:
+#
+#   - frame IDs of the capture thread's reads count up from 1 with no gaps
+#   - every analysed frame was read before its analysis started
+#   - every shown frame was analysed before the present that showed it
+#   - each latency the tracer kept is that present's end minus the
+#     frame's read end, as found in the trace
+#
+# and prints the capture-to-photon distribution. It then runs the preset
+# again uncapped with and without tracing and prints both frame rates.
+# Fails (exit 1) if any check fails.
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from matrix_rain import Engine, SyntheticCapture
+
+SIZE = (1280, 720)
+
+
+def run(preset, frames, fps, trace):
+    engine = Engine(preset, SIZE, capture=SyntheticCapture(*SIZE), fps=fps, trace=trace)
+    start = time.perf_counter()
+    engine.run(frames)
+    return engine, frames / (time.perf_counter() - start)
+
+
+def check(engine, path):
+    with open(path) as f:
+        events = json.load(f)["traceEvents"]
+    threads = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    spans = [e for e in events if e["ph"] == "X"]
+    failures = []
+
+    def where(name, thread):
+        return [e for e in spans if e["name"] == name and threads[e["tid"]] == thread]
+
+    reads = {e["args"]["frame"]: e for e in where("read", "capture")}
+    ids = sorted(reads)
+    if ids != list(range(1, len(ids) + 1)):
+        failures.append("read frame IDs skip or repeat")
+
+    analysed = {}
+    for e in where("resize", "analysis"):
+        frame = e["args"]["frame"]
+        analysed[frame] = e
+        if frame not in reads or reads[frame]["ts"] + reads[frame]["dur"] > e["ts"]:
+            failures.append(f"frame {frame} analysed before it was read")
+    done = {frame: max(e["ts"] + e["dur"] for e in where("sample", "analysis")
+                       if e["args"]["frame"] == frame) for frame in analysed}
+
+    presents = where("present", "MainThread")
+    first = {}
+    for e in presents:
+        frame = e["args"].get("frame")
+        if frame is None or frame in first:
+            continue
+        first[frame] = e
+        if frame not in done or done[frame] > e["ts"]:
+            failures.append(f"frame {frame} shown before its analysis finished")
+
+    # the tracer's own latencies against the spans: read end -> present end
+    expected = np.array([(e["ts"] + e["dur"]) - (reads[f]["ts"] + reads[f]["dur"])
+                         for f, e in sorted(first.items())]) / 1000.0
+    kept = engine.tracer.latencies() * 1000.0
+    if len(kept) != len(expected) or not np.allclose(kept, expected, atol=0.05):
+        failures.append("tracer latencies don't match the trace's spans")
+    return failures, len(reads), len(analysed), len(first)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_trace")
+    parser.add_argument("preset", nargs="?", default="attempt8")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--out", help="keep the trace here (default a temporary file)")
+    args = parser.parse_args(argv)
+
+    path = args.out or os.path.join(tempfile.mkdtemp(), "trace.json")
+    engine, _ = run(args.preset, args.frames, 60, path)
+    failures, reads, analysed, shown = check(engine, path)
+    latency = engine.tracer.summary()
+    print(f"{args.preset} at {SIZE[0]}x{SIZE[1]}, {args.frames} frames at 60 fps: "
+          f"{reads} read, {analysed} analysed, {shown} shown")
+    if latency["frames"]:
+        print(f"capture to photon ms: p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  "
+              f"p99 {latency['p99']:.1f}  max {latency['max']:.1f}")
+    for failure in failures:
+        print(f"FAIL {failure}")
+    print(f"trace: {path} ({os.path.getsize(path) // 1024} KB)")
+
+    _, untraced = run(args.preset, args.frames, None, None)
+    _, traced = run(args.preset, args.frames, None, os.devnull)
+    print(f"uncapped fps: {untraced:.1f} without tracing, {traced:.1f} with")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
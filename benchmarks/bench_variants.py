@@ -0,0 +1,222 @@
+# Headless end-to-end benchmark of every preset
+#
+#   python -m benchmarks.bench_variants
+#   python -m benchmarks.bench_variants attempt6 myTest --sizes 1280x720,1920x1080
+#   python -m benchmarks.bench_variants --source clip.mp4 --frames 600
+#
+# Each preset runs through the Engine in its own process under SDL's dummy
+# video driver, fed by a synthetic camera (or a looping video clip or
+# RecordingCapture .npy, which replays without decoding).
+# Every display flip/update is timestamped. Reported per preset and size:
+#
+#   fps        sustained presents per second after WARMUP frames
+#   frame ms   p50/p95/p99 time between presents
+#   latency ms p50/p95/p99 from camera read() returning to the present
+#              that shows that frame
+#   peak MB    peak resident memory of the process
+#
+# Frames are uncapped unless --capped, so the numbers show what each
+# approach can do rather than the 30 fps cap. The camera itself still
+# delivers at --camera-fps (30 by default, 0 = as fast as read).
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import traceback
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+import pygame
+
+from matrix_rain import Engine, PRESETS
+from matrix_rain.capture import LatestFrameReader
+from matrix_rain.recording import MemmapCapture
+from matrix_rain.sources import LoopingFileCapture, SyntheticCapture
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SIZES = [(800, 600), (1280, 720), (1920, 1080)]
+FRAMES = 300
+WARMUP = 30
+TIMEOUT = 60.0                    # wall-clock seconds per run before giving up
+
+
+# -----------------------
+# CHILD: run one preset
+# -----------------------
+def percentiles(values):
+    if len(values) == 0:
+        return [None, None, None]
+    return [round(float(v), 2) for v in np.percentile(values, (50, 95, 99))]
+
+
+def peak_rss_mb():
+    try:
+        import resource
+    except ImportError:           # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def run_variant(name, size, frames, warmup, source, camera_fps, capped):
+    presents = []
+    latencies = []
+    shown = {"taken": None}
+    stalled = []
+    deadline = time.perf_counter() + TIMEOUT
+
+    # ---- camera ----
+    latest = LatestFrameReader.latest
+
+    def timed_latest(self):
+        frame = latest(self)
+        if frame is not None:
+            shown["taken"] = frame.timestamp
+        return frame
+
+    LatestFrameReader.latest = timed_latest
+
+    # ---- display ----
+    def timed(present):
+        def wrapper(*args):
+            result = present(*args)
+            now = time.perf_counter()
+            presents.append(now)
+            if shown["taken"] is not None:
+                latencies.append(now - shown["taken"])
+            return result
+        return wrapper
+
+    pygame.display.flip = timed(pygame.display.flip)
+    pygame.display.update = timed(pygame.display.update)
+
+    get_events = pygame.event.get
+
+    def events(*args, **kwargs):
+        got = get_events(*args, **kwargs)
+        if len(presents) >= warmup + frames:
+            got.append(pygame.event.Event(pygame.QUIT))
+        elif time.perf_counter() > deadline:
+            stalled.append(len(presents))
+            got.append(pygame.event.Event(pygame.QUIT))
+        return got
+
+    pygame.event.get = events
+
+    result = {"variant": name, "size": f"{size[0]}x{size[1]}", "error": None}
+    if source and source.endswith(".npy"):
+        # no decoding: the pipeline's own time is all that's measured
+        capture = MemmapCapture(source, fps=camera_fps)
+    elif source:
+        capture = LoopingFileCapture(source, fps=camera_fps)
+    else:
+        capture = SyntheticCapture(*size, fps=camera_fps)
+    try:
+        Engine(name, size, capture=capture, fps=30 if capped else None, seed=0).run()
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+        traceback.print_exc(file=sys.stderr)
+
+    measured = np.asarray(presents[warmup:])
+    result["frames"] = len(measured)
+    if stalled:
+        # a loop that stops presenting isn't measured on whatever it draws
+        # after being told to quit
+        result["fps"] = None
+        result["error"] = result["error"] or f"timed out after {stalled[0]} frames"
+    elif len(measured) > 1:
+        result["fps"] = round((len(measured) - 1) / (measured[-1] - measured[0]), 1)
+    else:
+        result["fps"] = None
+        result["error"] = result["error"] or f"{len(presents)} frames presented"
+    result["frame_ms"] = percentiles(np.diff(measured) * 1000.0)
+    result["latency_ms"] = percentiles(np.asarray(latencies[warmup:]) * 1000.0)
+    result["peak_mb"] = peak_rss_mb()
+    return result
+
+
+# -----------------------
+# PARENT: one process per run
+# -----------------------
+def spawn(name, size, args):
+    cmd = [sys.executable, "-m", "benchmarks.bench_variants", "--child", name,
+           "--sizes", f"{size[0]}x{size[1]}", "--frames", str(args.frames),
+           "--warmup", str(args.warmup), "--camera-fps", str(args.camera_fps)]
+    if args.source:
+        cmd += ["--source", os.path.abspath(args.source)]
+    if args.capped:
+        cmd.append("--capped")
+    try:
+        proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True,
+                              timeout=TIMEOUT + 30)
+    except subprocess.TimeoutExpired:
+        return {"variant": name, "size": f"{size[0]}x{size[1]}", "error": "timed out"}
+    for line in reversed(proc.stdout.splitlines()):
+        if line.startswith("{"):
+            return json.loads(line)
+    tail = proc.stderr.strip().splitlines()[-1:] or [f"exit code {proc.returncode}"]
+    return {"variant": name, "size": f"{size[0]}x{size[1]}", "error": tail[0]}
+
+
+def report(result):
+    if result.get("fps") is None:
+        print(f"{result['variant']:<10}{result['size']:>11}  FAILED  {result['error']}")
+        return
+    p = "/".join(f"{v:.1f}" if v is not None else "-" for v in result["frame_ms"])
+    lat = "/".join(f"{v:.1f}" if v is not None else "-" for v in result["latency_ms"])
+    mem = f"{result['peak_mb']:.0f}" if result["peak_mb"] is not None else "-"
+    print(f"{result['variant']:<10}{result['size']:>11}{result['fps']:>8.1f}"
+          f"  {p:>18}  {lat:>18}  {mem:>7}")
+
+
+def parse_size(text):
+    w, h = text.lower().split("x")
+    return int(w), int(h)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("variants", nargs="*", default=list(PRESETS))
+    parser.add_argument("--sizes", default=",".join(f"{w}x{h}" for w, h in SIZES))
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--warmup", type=int, default=WARMUP)
+    parser.add_argument("--source", help="video file or recording (.npy) to loop instead of "
+                                         "the synthetic camera")
+    parser.add_argument("--camera-fps", type=float, default=30.0)
+    parser.add_argument("--capped", action="store_true", help="keep the 30 fps cap")
+    parser.add_argument("--json", help="also write all results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    sizes = [parse_size(s) for s in args.sizes.split(",")]
+    camera_fps = args.camera_fps or None
+
+    if args.child:
+        result = run_variant(args.child, sizes[0], args.frames, args.warmup,
+                             args.source, camera_fps, args.capped)
+        print(json.dumps(result))
+        return 0
+
+    print(f"{'variant':<10}{'size':>11}{'fps':>8}  {'frame ms p50/95/99':>18}"
+          f"  {'latency p50/95/99':>18}  {'peak MB':>7}")
+    results = []
+    for name in args.variants:
+        for size in sizes:
+            result = spawn(name, size, args)
+            results.append(result)
+            report(result)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# Edge analysis in a worker process against the same EdgeAnalyzer in-process
+#
+#   python -m benchmarks.bench_worker
+#   python -m benchmarks.bench_worker --size 1920x1080 --frames 120
+#
+# Feeds the same synthetic camera frames to an EdgeAnalyzer and to a
+# worker.ProcessAnalyzer wrapping a copy of it, for a full-grid preset's
+# analysis and a column preset's, each with and without incremental
+# analysis, and checks every grid is identical. Then it submits frames to
+# an AnalysisWorker faster than it can keep up, as a camera would: the
+# results must come back in order, skip the superseded frames, and the
+# last must match the in-process analysis of the last frame. Last, the
+# Engine runs a preset with processes=True and must draw frames from the
+# worker's grids and leave no worker process behind on close.
+#
+# Prints ms per frame in-process and as a round trip through the worker.
+# Fails (exit 1) on any mismatch.
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+import numpy as np
+
+from matrix_rain import AnalysisWorker, EdgeAnalyzer, Engine, ProcessAnalyzer, SyntheticCapture
+
+# (name, grid for WIDTH px, cell, EdgeAnalyzer keywords) like attempt8 and attempt5
+CASES = [
+    ("grid", lambda w, h: (h // 8, w // 8), (8, 8),
+     dict(canny=(40, 120), halo=6, gain=3.0, analysis_cell=4)),
+    ("columns", lambda w, h: (1, 60), lambda w, h: (w // 60, None),
+     dict(canny=(50, 120), halo=35, halo_mode="pyramid", analysis_cell=4)),
+]
+ENGINE_FRAMES = 120
+
+
+def clip(size, frames):
+    capture = SyntheticCapture(*size, fps=None)
+    return [capture.read()[1].copy() for _ in range(frames)]
+
+
+def compare(size, images, grid, cell, keywords):
+    local = EdgeAnalyzer(size, grid, cell, **keywords)
+    remote = ProcessAnalyzer(EdgeAnalyzer(size, grid, cell, **keywords))
+    out = np.empty(grid, np.float32)
+    try:
+        remote(images[0], out=out)            # start-up isn't a frame's cost
+        local(images[0])
+        same = True
+        local_time = remote_time = 0.0
+        for image in images[1:]:
+            start = time.perf_counter()
+            expected = local(image)
+            local_time += time.perf_counter() - start
+            start = time.perf_counter()
+            remote(image, out=out)
+            remote_time += time.perf_counter() - start
+            same &= np.array_equal(out, expected)
+    finally:
+        remote.close()
+    n = len(images) - 1
+    return same, local_time / n * 1000, remote_time / n * 1000
+
+
+def flood(size, images, grid, cell, keywords):
+    """Submit without waiting; returns a list of problems."""
+    problems = []
+    worker = AnalysisWorker(EdgeAnalyzer(size, grid, cell, **keywords), images[0].shape).start()
+    try:
+        seqs = []
+        for seq, image in enumerate(images, 1):
+            worker.submit(image, seq)
+            result = worker.result()
+            if result is not None:
+                seqs.append(result[1])
+        if not worker.wait(len(images), timeout=10.0):
+            return ["the worker never analysed the last frame"]
+        grid_out, seq = worker.result()
+        seqs.append(seq)
+        if seqs != sorted(seqs):
+            problems.append("results came back out of order")
+        if len(set(seqs)) >= len(images):
+            problems.append("no frame was superseded under a flood")
+        expected = EdgeAnalyzer(size, grid, cell, **keywords)(images[-1])
+        if not np.array_equal(grid_out, expected):
+            problems.append("the last result differs from analysing the last frame in-process")
+    finally:
+        worker.close()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_worker")
+    parser.add_argument("--size", default="1280x720")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--preset", default="attempt8")
+    args = parser.parse_args(argv)
+    w, h = args.size.lower().split("x")
+    size = (int(w), int(h))
+    images = clip(size, args.frames)
+    failures = []
+
+    print(f"{size[0]}x{size[1]}, {args.frames} frames: ms per frame")
+    print(f"{'analysis':<24}{'in-process':>11}{'worker':>9}  grids")
+    for name, grid, cell, keywords in CASES:
+        grid = grid(*size)
+        cell = cell(*size) if callable(cell) else cell
+        for incremental in (False, True):
+            label = f"{name}{' incremental' if incremental else ''}"
+            same, local, remote = compare(size, images, grid, cell,
+                                          dict(keywords, incremental=incremental))
+            print(f"{label:<24}{local:11.2f}{remote:9.2f}  {'same' if same else 'DIFFERENT'}")
+            if not same:
+                failures.append(f"{label}: the worker's grids differ from in-process analysis")
+        failures += [f"{name}: {p}" for p in flood(size, images, grid, cell, keywords)]
+
+    engine = Engine(args.preset, size, capture=SyntheticCapture(*size), fps=60, processes=True)
+    engine.run(ENGINE_FRAMES)
+    results = engine.analysis.results
+    print(f"Engine {args.preset} with processes=True: {engine.frames} frames drawn "
+          f"from {results} worker analyses")
+    if engine.frames < ENGINE_FRAMES or not results:
+        failures.append("the Engine didn't draw from the worker's grids")
+    if multiprocessing.active_children():
+        failures.append("a worker process outlived Engine.close()")
+
+    for failure in failures:
+        print(f"FAIL {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,19 @@
+from .analysis import EdgeAnalyzer
+from .camera import CameraMode, open_camera
+from .capture import Frame, LatestFrameReader
+from .compositor import GridCompositor
+from .dirty import DirtyStrips
+from .engine import Engine
+from .glyphs import GlyphAtlas, clear_atlases, get_atlas
+from .governor import QualityGovernor
+from .mjpeg import MjpegServer
+from .presets import PRESETS, get_preset
+from .recording import MemmapCapture, RecordingCapture
+from .render import OfflineRender, render_parallel
+from .sampling import cell_grid, column_profile
+from .scenes import SCENES, GridScene, StreamScene, TrailScene
+from .sources import LoopingFileCapture, SyntheticCapture
+from .streams import StreamRain
+from .timing import FrameTimer
+from .trace import Tracer
+from .worker import AnalysisWorker, ProcessAnalyzer
@@ -0,0 +1,176 @@
+# Run any preset:
+#
+#   python -m matrix_rain attempt6
+#   python -m matrix_rain attempt4 --size 1920x1080 --synthetic --hud
+#   python -m matrix_rain --list
+#   python -m matrix_rain attempt8 --source clip.mp4 --render out.mp4
+#   python -m matrix_rain attempt8 --source clip.mp4 --render out.mp4 --workers 8
+#   python -m matrix_rain attempt8 --record site.npy
+#   python -m matrix_rain attempt8 --source site.npy
+#   python -m matrix_rain attempt8 --cameras 0,1 --layout merge
+#   python -m matrix_rain attempt8 --serve 8080
+#   python -m matrix_rain attempt8 --process
+
+import argparse
+import sys
+
+from .engine import Engine
+from .presets import PRESETS, get_preset
+from .render import OfflineRender, render_parallel
+from .recording import MemmapCapture
+from .sources import LoopingFileCapture, SyntheticCapture
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m matrix_rain")
+    parser.add_argument("preset", nargs="?", default="attempt6")
+    parser.add_argument("--list", action="store_true", help="list the presets and exit")
+    parser.add_argument("--size", help="window size as WIDTHxHEIGHT")
+    parser.add_argument("--synthetic", action="store_true", help="use the synthetic camera")
+    parser.add_argument("--source", help="loop a video file, or a --record recording at "
+                                         "its original pace, instead of the camera")
+    parser.add_argument("--cameras", metavar="LIST",
+                        help="comma-separated camera indices or device paths to run at "
+                             "once; with --synthetic, one synthetic camera each")
+    parser.add_argument("--layout", choices=["tile", "merge"],
+                        help="with --cameras: a band of columns per camera, left to right "
+                             "(default), or every camera over the whole grid")
+    parser.add_argument("--camera-size", help="ask the camera for WIDTHxHEIGHT "
+                                              "(default its own mode)")
+    parser.add_argument("--camera-fps", type=float, help="ask the camera for this frame rate")
+    parser.add_argument("--fps", type=float,
+                        help="render rate cap, 0 for uncapped (default 60); with --render, "
+                             "the output frame rate (default the source's)")
+    parser.add_argument("--analysis-fps", type=float, help="edge analysis rate cap")
+    parser.add_argument("--blend", choices=["none", "exp", "linear"], default="exp",
+                        help="how analysis results are blended between updates")
+    parser.add_argument("--inline", action="store_true", help="analyse in the render loop")
+    parser.add_argument("--process", action="store_true",
+                        help="analyse each camera in a worker process of its own")
+    parser.add_argument("--frames", type=int, help="stop after this many frames")
+    parser.add_argument("--analysis-cell", type=int, default=4)
+    parser.add_argument("--incremental", action="store_true",
+                        help="only re-analyse the parts of the frame that changed")
+    parser.add_argument("--target-fps", type=float,
+                        help="trade away detail at runtime to hold this frame rate")
+    parser.add_argument("--hud", action="store_true", help="per-stage timing overlay")
+    parser.add_argument("--csv", help="write per-frame stage timings here")
+    parser.add_argument("--record", metavar="NPY",
+                        help="keep the last --record-frames camera frames in this file")
+    parser.add_argument("--record-frames", type=int, default=600)
+    parser.add_argument("--trace", metavar="JSON",
+                        help="write a Chrome/Perfetto trace of the run here and print "
+                             "the capture-to-photon latency")
+    parser.add_argument("--serve", metavar="[HOST:]PORT",
+                        help="stream the window as MJPEG over HTTP on this port "
+                             "(localhost only unless a HOST is given, e.g. 0.0.0.0:8080)")
+    parser.add_argument("--render", metavar="OUTPUT",
+                        help="render --source offline to a video file, or to numbered "
+                             "images with a pattern like frames/%%05d.png")
+    parser.add_argument("--seed", type=int,
+                        help="scene seed (default 0 with --render, else unseeded)")
+    parser.add_argument("--workers", type=int,
+                        help="split --render of a --source file across this many processes")
+    parser.add_argument("--warmup", type=float, default=3.0,
+                        help="seconds each --workers segment renders before its first frame")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, config in PRESETS.items():
+            print(f"{name:<10} {config['scene']:<8} {config['title']}")
+        return 0
+
+    size = None
+    if args.size:
+        w, h = args.size.lower().split("x")
+        size = (int(w), int(h))
+    overrides = {}
+    if args.camera_size:
+        w, h = args.camera_size.lower().split("x")
+        overrides["camera_size"] = (int(w), int(h))
+    if args.camera_fps:
+        overrides["camera_fps"] = args.camera_fps
+    cameras = None
+    if args.cameras:
+        cameras = [int(c) if c.isdigit() else c for c in args.cameras.split(",")]
+        overrides["camera"] = cameras
+    if args.layout:
+        overrides["camera_layout"] = args.layout
+    if args.incremental:
+        overrides["analysis"] = dict(get_preset(args.preset)["analysis"], incremental=True)
+
+    if args.render and args.record:
+        parser.error("--record records a live run, not a --render")
+    if args.process and (args.inline or args.render):
+        parser.error("--process analyses a live run on threads; not with --inline or --render")
+    if args.render and args.serve:
+        parser.error("--serve streams a live run, not a --render")
+    serve = None
+    if args.serve:
+        host, _, port = args.serve.rpartition(":")
+        serve = (host, int(port)) if host else int(port)
+    if args.render and args.cameras:
+        parser.error("--render takes one --source, not --cameras")
+    if args.render and args.workers:
+        if not args.source:
+            parser.error("--workers needs a --source file")
+        written = render_parallel(args.preset, args.source, args.render, args.workers,
+                                  warmup=args.warmup, size=size, fps=args.fps,
+                                  seed=args.seed or 0, analysis_cell=args.analysis_cell or None,
+                                  **overrides)
+        print(f"wrote {written} frames to {args.render}")
+        timers = []
+    elif args.render:
+        if args.synthetic:
+            source = SyntheticCapture(fps=None)
+        elif args.source:
+            source = args.source
+        else:
+            parser.error("--render needs --source or --synthetic")
+        render = OfflineRender(args.preset, source, args.render, size, fps=args.fps,
+                               seed=args.seed or 0, analysis_cell=args.analysis_cell or None,
+                               **overrides)
+        render.run(args.frames)
+        print(f"wrote {render.frames} frames to {args.render}")
+        timers = [("render", render.timer)]
+    else:
+        capture = None
+        if args.source and args.source.endswith(".npy"):
+            capture = MemmapCapture(args.source)
+        elif args.source:
+            capture = LoopingFileCapture(args.source)
+        elif args.synthetic and cameras:
+            capture = [SyntheticCapture(seed=k) for k in range(len(cameras))]
+        elif args.synthetic:
+            capture = SyntheticCapture()
+        fps = 60 if args.fps is None else args.fps or None
+        engine = Engine(args.preset, size, capture=capture, fps=fps,
+                        analysis_fps=args.analysis_fps,
+                        blend=None if args.blend == "none" else args.blend,
+                        threaded=not args.inline, processes=args.process,
+                        analysis_cell=args.analysis_cell or None,
+                        timing_hud=args.hud, timing_csv=args.csv, seed=args.seed,
+                        target_fps=args.target_fps, trace=args.trace, record=args.record,
+                        record_frames=args.record_frames, serve=serve, **overrides)
+        engine.run(args.frames)
+        timers = [("render", engine.timer)] + [(clock.name, clock.timer)
+                                               for clock in engine.analyses]
+        if engine.tracer is not None:
+            latency = engine.tracer.summary()
+            if latency["frames"]:
+                print(f"capture to photon: {latency['frames']} frames, p50 {latency['p50']:.1f} "
+                      f"p95 {latency['p95']:.1f} p99 {latency['p99']:.1f} "
+                      f"max {latency['max']:.1f} ms")
+            print(f"wrote trace to {args.trace}")
+
+    for title, timer in timers:
+        if timer is None or not timer.frames:
+            continue
+        print(f"{title}: {timer.frames} frames, p50/p95/p99")
+        for name, (p50, p95, p99) in timer.summary().items():
+            print(f"  {name:<10}{p50:7.2f}{p95:7.2f}{p99:7.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
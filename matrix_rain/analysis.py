@@ -0,0 +1,354 @@
+import math
+
+import cv2
+import numpy as np
+
+from . import kernels
+from .sampling import cell_grid, spans
+
+HALO_MODES = ("gaussian", "pyramid", "distance")
+
+# go down the pyramid while at least this much blur (in the coarse
+# level's pixels) is left to do there
+PYRAMID_SIGMA = 2.0
+
+# incremental mode: each tile is compared as TILE_SAMPLES² area means.
+# Hysteresis lets a changed tile flip weak edges just outside it, so
+# Canny is redone this far past the changed tiles, from a cut-out
+# another CANNY_REACH wider so the redone part sees the whole-frame
+# neighbourhood.
+TILE_SAMPLES = 8
+CANNY_REACH = 16
+
+
+def _pyramid_rest(sigma, n):
+    # pyrDown and pyrUp each blur with variance 1 in the finer level's
+    # pixels, so n levels down and back up already cover 2(4^n - 1)/3
+    done = 2 * (4 ** n - 1) / 3
+    return np.sqrt(max(sigma * sigma - done, 0.0)) / 2 ** n
+
+
+def _grow(box, margin, width, height, align=1):
+    # box (x0, y0, x1, y1) grown by `margin`, clipped to the frame, its
+    # origin rounded down to a multiple of `align`
+    x0, y0, x1, y1 = box
+    x0 = max(x0 - margin, 0) // align * align
+    y0 = max(y0 - margin, 0) // align * align
+    return x0, y0, min(x1 + margin, width), min(y1 + margin, height)
+
+
+def _inner(box, outer):
+    # slices of `box` inside an array cut out at `outer`
+    x0, y0, x1, y1 = box
+    return slice(y0 - outer[1], y1 - outer[1]), slice(x0 - outer[0], x1 - outer[0])
+
+
+def _region(box):
+    x0, y0, x1, y1 = box
+    return slice(y0, y1), slice(x0, x1)
+
+
+class EdgeAnalyzer:
+    """The resize → gray → Canny → halo → normalize → sample chain every attempt runs.
+
+    size:  (width, height) of the display the grid is drawn on
+    grid:  (rows, cols) of the result; rows == 1 gives a per-column profile
+    cell:  (cell_w, cell_h) in display pixels, or None to split evenly;
+           cell_h may be None on its own for full-height columns
+    halo:  Gaussian sigma of the glow around edges in display pixels,
+           or None for raw edges
+    halo_mode:
+           how the glow is made, see HALO_MODES. "gaussian" blurs the edge
+           map at full size, which gets slower as the halo grows.
+           "pyramid" blurs a pyrDown'd copy with the leftover sigma and
+           pyrUp's it back, and "distance" shades every pixel by its
+           distance to the nearest edge with a Gaussian falloff. The cost
+           of both barely depends on the radius.
+    gain:  multiplier applied before clamping the result to 0–1
+    analysis_cell:
+           pixels per cell (horizontally) to run edge detection at, or None
+           to analyse at the full display size. The part of the frame the
+           grid covers is resized straight to that resolution and the halo
+           sigma is scaled to match, so the work follows the character grid
+           instead of the monitor.
+    incremental:
+           only redo the frame's changed tiles. The gray frame is split
+           into about `tile` × `tile` pixel tiles (at the analysis size)
+           and compared, as TILE_SAMPLES² area means, with what each tile
+           was last analysed from. Tiles off by more than
+           `change_threshold` gray levels get fresh edges, the halo is
+           redone out to its radius around them and only the grid cells
+           under that are resampled. A static frame costs a resize and a
+           diff. More than `full_fraction` of the tiles changed (a cut,
+           the camera moving) falls back to the whole-frame chain.
+
+    Set `timer` to a FrameTimer to have resize, canny, halo and sample
+    charged as separate stages.
+
+    Every intermediate image lives in a buffer allocated on the first call
+    and reused afterwards (OpenCV dst= outputs, in-place NumPy ops), so a
+    steady-state frame allocates no image-sized memory. Unless an `out`
+    array is passed, the returned grid is one of those buffers too and is
+    overwritten by the next call.
+    """
+
+    def __init__(self, size, grid, cell=None, canny=(40, 120), halo=6, gain=1.0,
+                 analysis_cell=None, halo_mode="gaussian", incremental=False, tile=32,
+                 change_threshold=12, full_fraction=0.5):
+        if halo_mode not in HALO_MODES:
+            raise ValueError(f"halo_mode must be one of {HALO_MODES}, not {halo_mode!r}")
+        self.size = tuple(size)
+        self.grid = tuple(grid)
+        self.cell = cell
+        self.canny = canny
+        self.halo = halo
+        self.gain = gain
+        self.analysis_cell = analysis_cell
+        self.halo_mode = halo_mode
+        self.incremental = incremental
+        self.tile = tile
+        self.change_threshold = change_threshold
+        self.full_fraction = full_fraction
+        self.timer = None
+        self._plan()
+        self._buffers = None
+        self._tiles = None
+        self._norm = None
+
+    def _plan(self):
+        width, height = self.size
+        rows, cols = self.grid
+        cell_w, cell_h = self.cell or (None, None)
+
+        if self.analysis_cell is None:
+            self.scale = 1.0
+            self.region = None
+            self.analysis_size = self.size
+            self._sample_cell = (cell_w, cell_h)
+            return
+
+        # display area covered by the grid; pixels past the last cell are never drawn
+        region_w = cols * cell_w if cell_w else width
+        region_h = rows * cell_h if cell_h else height
+        self.region = (region_w / width, region_h / height)
+
+        k = self.analysis_cell
+        self.scale = k * cols / region_w
+        if cell_h:
+            k_h = max(1, round(cell_h * self.scale))
+            self.analysis_size = (cols * k, rows * k_h)
+            self._sample_cell = (k, k_h)
+        else:
+            self.analysis_size = (cols * k, max(rows, round(region_h * self.scale)))
+            self._sample_cell = (k, None)
+
+    def __getstate__(self):
+        # buffers are rebuilt on first use; don't ship them to worker processes
+        state = self.__dict__.copy()
+        state["_buffers"] = None
+        state["timer"] = None
+        state["_tiles"] = None
+        state["_norm"] = None
+        return state
+
+    def _pyramid_plan(self, sigma):
+        """Pyramid depth and the sigma left to blur at the coarsest level."""
+        width, height = self.analysis_size
+        n = 0
+        while (min(width, height) >> (n + 1) >= 8
+               and _pyramid_rest(sigma, n + 1) >= PYRAMID_SIGMA):
+            n += 1
+        return n, _pyramid_rest(sigma, n)
+
+    def _allocate(self):
+        width, height = self.analysis_size
+        field = np.empty((height, width), np.float32)
+        # pyramid levels below the full-size field, for halo_mode="pyramid"
+        levels = [field]
+        if self.halo and self.halo_mode == "pyramid":
+            n, self._pyramid_sigma = self._pyramid_plan(self.halo * self.scale)
+            for _ in range(n):
+                h, w = levels[-1].shape
+                levels.append(np.empty(((h + 1) // 2, (w + 1) // 2), np.float32))
+        self._buffers = (
+            np.empty((height, width, 3), np.uint8),     # resized frame
+            np.empty((height, width), np.uint8),        # gray
+            np.empty((height, width), np.uint8),        # edges
+            field,                                      # halo field, before normalizing
+            np.empty(self.grid, np.float32),            # sampled field
+            np.empty(self.grid, np.float32),            # result grid
+            levels,
+        )
+        if self.incremental:
+            rows, cols = self.grid
+            cell_w, cell_h = self._sample_cell
+            # compare at 1/b size, b pixels a sample, so the resize is an
+            # integer box shrink whenever b divides the frame
+            b = max(1, self.tile // TILE_SAMPLES)
+            sw, sh = max(1, round(width / b)), max(1, round(height / b))
+            tx, ty = -(-sw // TILE_SAMPLES), -(-sh // TILE_SAMPLES)
+            small = np.empty((sh, sw), np.uint8)
+            self._tiles = (
+                np.minimum(np.arange(tx + 1) * TILE_SAMPLES, sw) * width // sw,   # tile
+                np.minimum(np.arange(ty + 1) * TILE_SAMPLES, sh) * height // sh,  # bounds
+                spans(width, cols, cell_w), spans(height, rows, cell_h),  # cell bounds
+                small,                                      # this frame
+                np.empty_like(small),                       # as last analysed
+                np.empty_like(small),                       # |difference|
+                # samples over the threshold, padded to whole tiles
+                np.zeros((ty * TILE_SAMPLES, tx * TILE_SAMPLES), np.uint8),
+                np.empty((ty, tx), np.uint8),               # per tile
+            )
+        return self._buffers
+
+    def _halo(self, edges, field, levels, scratch):
+        # glow of `edges` into `field`, not yet normalized; works on any
+        # cut-out as long as `levels` and `scratch` match its shape
+        sigma = (self.halo or 0) * self.scale
+        if self.halo and self.halo_mode == "distance":
+            # distance to the nearest edge pixel (edges are 0 in the inverse)
+            cv2.bitwise_not(edges, dst=scratch)
+            cv2.distanceTransform(scratch, cv2.DIST_L2, cv2.DIST_MASK_5, dst=field)
+            # past 4 sigma the glow is ~0; clamping keeps exp() out of denormals
+            cv2.min(field, 4.0 * sigma, dst=field)
+            cv2.multiply(field, field, dst=field, scale=-0.5 / (sigma * sigma))
+            cv2.exp(field, dst=field)
+            return
+        np.copyto(field, edges)
+        if self.halo and self.halo_mode == "pyramid":
+            for fine, coarse in zip(levels, levels[1:]):
+                cv2.pyrDown(fine, dst=coarse, dstsize=coarse.shape[::-1])
+            if self._pyramid_sigma > 0:
+                cv2.GaussianBlur(levels[-1], (0, 0), self._pyramid_sigma, dst=levels[-1])
+            for fine, coarse in zip(levels[-2::-1], levels[:0:-1]):
+                cv2.pyrUp(coarse, dst=fine, dstsize=fine.shape[::-1])
+        elif self.halo:
+            cv2.GaussianBlur(field, (0, 0), sigma, dst=field)
+
+    def _normalize(self, field):
+        # factor taking the sampled field to 0–1 before the gain
+        if not self.halo:
+            # a one-pixel edge covers a larger share of a smaller cell
+            self._norm = self.scale / 255
+        elif self.halo_mode == "distance":
+            self._norm = 1.0
+        else:
+            peak = cv2.minMaxLoc(field)[1]
+            self._norm = 1.0 / peak if peak > 0 else 1.0
+
+    def _changed_tiles(self, gray):
+        """Tiles of `gray` that moved past the threshold, or None to redo the whole frame."""
+        _, _, _, _, small, reference, diff, hot, tiles = self._tiles
+        cv2.resize(gray, small.shape[::-1], dst=small, interpolation=cv2.INTER_AREA)
+        if self._norm is None:
+            np.copyto(reference, small)
+            return None
+
+        cv2.absdiff(small, reference, dst=diff)
+        sh, sw = small.shape
+        cv2.threshold(diff, self.change_threshold, 255, cv2.THRESH_BINARY, dst=hot[:sh, :sw])
+        # any hot sample makes its tile's mean nonzero
+        cv2.resize(hot, tiles.shape[::-1], dst=tiles, interpolation=cv2.INTER_AREA)
+        changed = tiles > 0
+        if changed.mean() > self.full_fraction:
+            np.copyto(reference, small)
+            return None
+        # only redone tiles move on; slow drift elsewhere adds up until it counts
+        if changed.any():
+            s = TILE_SAMPLES
+            np.copyto(reference, small, where=changed.repeat(s, 0).repeat(s, 1)[:sh, :sw])
+        return changed
+
+    def _patch(self, changed, gray, edges, field, sampled, levels):
+        xs, ys, cxs, cys = self._tiles[:4]
+        width, height = self.analysis_size
+        timer = self.timer
+
+        # 1. Canny over each group of touching tiles
+        boxes = []
+        stats = cv2.connectedComponentsWithStats(changed.view(np.uint8), connectivity=8)[2]
+        for x, y, w, h, _ in stats[1:].tolist():
+            box = _grow((int(xs[x]), int(ys[y]), int(xs[x + w]), int(ys[y + h])), CANNY_REACH,
+                        width, height)
+            outer = _grow(box, CANNY_REACH, width, height)
+            edges[_region(box)] = cv2.Canny(gray[_region(outer)], *self.canny)[_inner(box, outer)]
+            boxes.append(box)
+        if timer:
+            timer.lap("canny")
+
+        # 2. Halo out to its radius around them, from edges another radius out
+        reach, align = 0, 1
+        if self.halo:
+            reach = math.ceil(4 * self.halo * self.scale) + 2
+            if self.halo_mode == "pyramid":
+                # start on the full frame's pyrDown grid at every level
+                align = 2 ** (len(levels) - 1)
+                reach += 2 * align
+        for i, box in enumerate(boxes):
+            box = boxes[i] = _grow(box, reach, width, height)
+            outer = _grow(box, reach, width, height, align)
+            local = np.empty((outer[3] - outer[1], outer[2] - outer[0]), np.float32)
+            local_levels = [local]
+            for _ in levels[1:]:
+                h, w = local_levels[-1].shape
+                local_levels.append(np.empty(((h + 1) // 2, (w + 1) // 2), np.float32))
+            self._halo(edges[_region(outer)], local, local_levels,
+                       np.empty(local.shape, np.uint8))
+            field[_region(box)] = local[_inner(box, outer)]
+        if timer:
+            timer.lap("halo")
+
+        # 3. Resample the cells under the redone halo
+        rows, cols = self.grid
+        for x0, y0, x1, y1 in boxes:
+            r0 = np.searchsorted(cys, y0, "right") - 1
+            r1 = min(np.searchsorted(cys, y1), rows)
+            c0 = np.searchsorted(cxs, x0, "right") - 1
+            c1 = min(np.searchsorted(cxs, x1), cols)
+            if r0 >= r1 or c0 >= c1:
+                continue
+            kernels.cell_means(field, cys[r0:r1 + 1], cxs[c0:c1 + 1], sampled[r0:r1, c0:c1])
+
+    def __call__(self, frame, out=None):
+        resized, gray, edges, field, sampled, grid, levels = self._buffers or self._allocate()
+        if out is None:
+            out = grid
+        timer = self.timer
+
+        if self.region is not None:
+            fx, fy = self.region
+            frame = frame[:round(frame.shape[0] * fy), :round(frame.shape[1] * fx)]
+        width, height = self.analysis_size
+        if frame.shape[:2] != (height, width):
+            frame = cv2.resize(frame, self.analysis_size, dst=resized)
+        cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=gray)
+        if timer:
+            timer.lap("resize")
+
+        changed = self._changed_tiles(gray) if self.incremental else None
+        if changed is None:
+            # 1. Canny edges
+            cv2.Canny(gray, *self.canny, edges=edges)
+            if timer:
+                timer.lap("canny")
+
+            # 2. Halo around edges (gray is free again, so it's the scratch)
+            self._halo(edges, field, levels, gray)
+            self._normalize(field)
+            if timer:
+                timer.lap("halo")
+
+            # 3. Sample on the character grid
+            rows, cols = self.grid
+            cell_w, cell_h = self._sample_cell
+            cell_grid(field, rows, cols, cell_w, cell_h, sampled)
+        elif changed.any():
+            self._patch(changed, gray, edges, field, sampled, levels)
+            self._normalize(field)
+
+        # 4. Normalize to 0–1, gain and clamp
+        np.multiply(sampled, self.gain * self._norm, out=out)
+        np.clip(out, 0.0, 1.0, out=out)
+        if timer:
+            timer.lap("sample")
+        return out
@@ -0,0 +1,100 @@
+import sys
+from collections import namedtuple
+
+import cv2
+
+# Capture API per platform, first choice first. The attempt scripts all
+# used CAP_DSHOW, which only exists on Windows; CAP_ANY lets OpenCV pick.
+BACKENDS = {
+    "linux": ("V4L2", "ANY"),
+    "win32": ("DSHOW", "MSMF", "ANY"),
+    "darwin": ("AVFOUNDATION", "ANY"),
+}
+# Pixel formats to ask for, in order. MJPG is what USB cameras deliver at
+# full rate at 720p and up; raw YUYV saturates USB 2 at low frame rates.
+FOURCCS = ("MJPG", "YUYV")
+CAMERA_FPS = 60                   # asked for when no rate is given; drivers clamp to the mode's best
+
+
+class CameraMode(namedtuple("CameraMode", "backend fourcc width height fps buffer")):
+    """What a camera is delivering, as its driver reports it."""
+
+    __slots__ = ()
+
+    def __str__(self):
+        fps = f"{self.fps:g} fps" if self.fps else "unknown fps"
+        buffer = f"buffer {self.buffer}" if self.buffer > 0 else "default buffer"
+        return f"{self.backend} {self.fourcc or '?'} {self.width}x{self.height} @ {fps}, {buffer}"
+
+
+def fourcc_name(code):
+    """CAP_PROP_FOURCC's number as its four characters ('' when unknown)."""
+    code = int(code)
+    if code <= 0:
+        return ""
+    return "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\0 ")
+
+
+def backends_for(platform=sys.platform):
+    """The capture APIs to try on `platform`, as cv2.CAP_* names."""
+    for prefix, names in BACKENDS.items():
+        if platform.startswith(prefix):
+            return names
+    return ("ANY",)
+
+
+def camera_mode(capture, backend=None):
+    """CameraMode of an open capture as the driver reports it now."""
+    if backend is None:
+        try:
+            backend = capture.getBackendName()
+        except (AttributeError, cv2.error):
+            backend = "?"
+    return CameraMode(backend, fourcc_name(capture.get(cv2.CAP_PROP_FOURCC)),
+                      int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                      int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                      capture.get(cv2.CAP_PROP_FPS),
+                      int(capture.get(cv2.CAP_PROP_BUFFERSIZE)))
+
+
+def open_camera(index=0, size=None, fps=None, backends=None, fourccs=FOURCCS, buffer=1):
+    """Open a camera in its fastest native mode; returns (capture, CameraMode).
+
+    Tries each capture API in `backends` (default backends_for() this
+    platform) until one opens, then asks for each pixel format in
+    `fourccs` until the driver takes one. Size and rate are requests:
+    the driver snaps them to the nearest mode the camera really has, so
+    no rescaling happens in the driver, and the mode returned is what
+    was read back afterwards. The analyzer scales frames to its own
+    resolution anyway, so a small native mode is the fast choice.
+
+    index:    camera index, or a device path such as "/dev/video2"
+    size:     (width, height) to ask for, or None for the driver's
+              default mode (usually the camera's own)
+    fps:      frame rate to ask for; default CAMERA_FPS
+    backends: cv2.CAP_* names such as "V4L2" or "DSHOW", in order
+    fourccs:  pixel formats to ask for, in order; () to leave it alone
+    buffer:   frames the driver may queue (CAP_PROP_BUFFERSIZE); 1 keeps
+              only the newest, for the lowest latency
+    """
+    for name in backends or backends_for():
+        capture = cv2.VideoCapture(index, getattr(cv2, f"CAP_{name}"))
+        if capture.isOpened():
+            break
+        capture.release()
+    else:
+        raise IOError(f"cannot open camera {index!r} with {', '.join(backends or backends_for())}")
+
+    # format first: V4L2 picks the sizes and rates on offer per format
+    for fourcc in fourccs:
+        capture.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if fourcc_name(capture.get(cv2.CAP_PROP_FOURCC)) == fourcc:
+            break
+    if size is not None:
+        capture.set(cv2.CAP_PROP_FRAME_WIDTH, size[0])
+        capture.set(cv2.CAP_PROP_FRAME_HEIGHT, size[1])
+    capture.set(cv2.CAP_PROP_FPS, fps or CAMERA_FPS)
+    if buffer:
+        capture.set(cv2.CAP_PROP_BUFFERSIZE, buffer)
+    # CAP_ANY: ask which API OpenCV chose
+    return capture, camera_mode(capture, None if name == "ANY" else name)
@@ -0,0 +1,102 @@
+import threading
+import time
+from collections import namedtuple
+
+import cv2
+
+# image: BGR ndarray, timestamp: time.perf_counter() when read returned,
+# seq: 1, 2, 3, ... in capture order
+Frame = namedtuple("Frame", "image timestamp seq")
+
+
+class LatestFrameReader:
+    """Reads a cv2.VideoCapture on its own thread, keeping only the newest frame.
+
+    The render loop calls latest() whenever it wants a frame and never
+    blocks on the camera. Frames that arrive faster than they are taken are
+    overwritten and counted in `dropped`. After a failed read the previous
+    good frame stays available, so the animation keeps running while the
+    camera hiccups. With a trace.Tracer in `tracer` every read() is
+    recorded as a "read" span. `name` names the thread, which is the
+    trace track of its reads.
+    """
+
+    def __init__(self, cap, name="capture"):
+        self.cap = cap
+        self.name = name
+        # ask the driver not to queue stale frames (ignored where unsupported)
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
+        self.dropped = 0
+        self.failures = 0             # consecutive failed reads
+        self.tracer = None
+
+        self._frame = None
+        self._taken = 0
+        self._started = None
+        self._running = False
+        self._thread = None
+        self._ready = threading.Condition()
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _run(self):
+        seq = 0
+        while self._running:
+            start = time.perf_counter()
+            ok, image = self.cap.read()
+            now = time.perf_counter()
+            if not ok:
+                if self.tracer is not None:
+                    self.tracer.span("read failed", None, start, now)
+                self.failures += 1
+                time.sleep(0.005)
+                continue
+
+            self.failures = 0
+            seq += 1
+            if self.tracer is not None:
+                self.tracer.span("read", seq, start, now)
+            with self._ready:
+                prev = self._frame
+                if prev is not None and prev.seq > self._taken:
+                    self.dropped += 1
+                self._frame = Frame(image, now, seq)
+                self._ready.notify_all()
+
+    def latest(self):
+        """Newest good frame, or None until the first one arrives."""
+        frame = self._frame
+        if frame is not None:
+            self._taken = frame.seq
+        return frame
+
+    def wait(self, after_seq=0, timeout=None):
+        """Block until a frame newer than `after_seq` exists (or timeout)."""
+        with self._ready:
+            self._ready.wait_for(
+                lambda: self._frame is not None and self._frame.seq > after_seq, timeout)
+        return self.latest()
+
+    def age(self):
+        """Seconds since the last good frame (or since start, before the first)."""
+        frame = self._frame
+        since = frame.timestamp if frame is not None else self._started
+        return time.perf_counter() - since
@@ -0,0 +1,75 @@
+import numpy as np
+import pygame
+
+from . import kernels
+
+
+def green_lut(lo=60, hi=255, levels=32):
+    """Brightness → colour table: `levels` greens from (0, lo, 0) to (0, hi, 0)."""
+    lut = np.zeros((levels, 3), dtype=np.uint8)
+    lut[:, 1] = np.round(np.linspace(lo, hi, levels))
+    return lut
+
+
+class GridCompositor:
+    """Builds a whole character grid as one RGB array and blits it once.
+
+    Every (brightness level, glyph) pair is pre-shaded into an RGB tile at
+    startup. A frame is then one gather of tiles by per-cell level and
+    glyph index into a preallocated framebuffer (kernels.composite). The
+    framebuffer backs a pygame Surface (image.frombuffer), so present()
+    is a single blit. The Python-level work per frame is the same for any
+    rows × cols.
+
+    fade: 0 redraws every cell over black. Otherwise the previous frame is
+    dimmed by this fraction (0–1) and glyphs are drawn over it with a
+    lighten blend, which gives the fading trails of a translucent fill.
+    Glyphs are cropped to their cell.
+    """
+
+    def __init__(self, atlas, rows, cols, cell, lut, fade=0.0):
+        cell_w, cell_h = cell
+        self.rows = rows
+        self.cols = cols
+        self.cell = cell
+        self.size = (cols * cell_w, rows * cell_h)
+        self.levels = len(lut)
+
+        masks = atlas.masks(cell_w, cell_h).astype(np.uint16)
+        glyphs = len(masks)
+        # (levels * glyphs, cell_h, cell_w, 3): tile of glyph g at level l
+        tiles = masks[None, :, :, :, None] * np.asarray(lut, np.uint16)[:, None, None, None, :]
+        self._tiles = (tiles // 255).astype(np.uint8).reshape(-1, cell_h, cell_w, 3)
+        self._glyphs = glyphs
+
+        width, height = self.size
+        self.frame = np.zeros((height, width, 3), dtype=np.uint8)
+        self._gather = np.empty((rows, cols, cell_h, cell_w, 3), dtype=np.uint8)
+        self._flat = np.empty((rows, cols), dtype=np.intp)
+        self._level = np.empty((rows, cols), dtype=np.float32)
+        self._levels_buf = np.empty((rows, cols), dtype=np.intp)
+        self.surface = pygame.image.frombuffer(self.frame, self.size, "RGB")
+
+        self.fade = fade
+        self._fade_lut = np.round(np.arange(256) * (1.0 - fade)).astype(np.uint8)
+
+    def quantize(self, brightness, out=None):
+        """0–1 brightness grid → LUT level indices (reused buffer unless `out`)."""
+        if out is None:
+            out = self._levels_buf
+        np.multiply(brightness, self.levels - 1, out=self._level)
+        np.clip(self._level, 0, self.levels - 1, out=self._level)
+        np.rint(self._level, out=self._level)
+        out[...] = self._level
+        return out
+
+    def compose(self, glyphs, levels):
+        """Render the grid from (rows, cols) glyph indices and LUT levels."""
+        np.multiply(levels, self._glyphs, out=self._flat)
+        np.add(self._flat, glyphs, out=self._flat)
+        return kernels.composite(self.frame, self._tiles, self._flat,
+                                 self._fade_lut if self.fade else None, self._gather)
+
+    def present(self, screen, glyphs, levels, dest=(0, 0)):
+        self.compose(glyphs, levels)
+        screen.blit(self.surface, dest)
@@ -0,0 +1,72 @@
+import numpy as np
+import pygame
+
+
+def fade_frames(layer):
+    """Frames until a full-bright pixel stops changing under repeated blits of `layer`.
+
+    Measured with pygame's own blending, which stalls at a dim residue
+    instead of reaching black for small alphas.
+    """
+    if layer is None:
+        return 1
+    probe = pygame.Surface((1, 1))
+    probe.fill((255, 255, 255))
+    tile = layer.subsurface((0, 0, 1, 1))
+    frames = 0
+    while frames < 1024:
+        before = probe.get_at((0, 0))
+        probe.blit(tile, (0, 0))
+        frames += 1
+        if probe.get_at((0, 0)) == before:
+            break
+    return frames
+
+
+class DirtyStrips:
+    """Tracks which column strips changed, for display.update(rects).
+
+    A strip is dirty in the frame a glyph is drawn in it and for as long
+    as the translucent fade layer is still dimming what was drawn there.
+    Strips that have faded out are left alone: they are skipped by
+    fade() and not pushed to the display, so a quiet scene costs almost
+    nothing. Adjacent dirty strips are merged into one rect.
+    """
+
+    def __init__(self, columns, col_width, height, fade_layer=None, x0=0):
+        self.columns = columns
+        self.col_width = col_width
+        self.height = height
+        self.x0 = x0
+        self.ttl = fade_frames(fade_layer)
+        # frames since something was drawn in each strip
+        self._age = np.full(columns, self.ttl + 1, dtype=np.int32)
+        self._full = True
+
+    def invalidate(self):
+        """Push the whole area on the next frame (first frame, resize, ...)."""
+        self._full = True
+
+    def mark(self, cols):
+        """Columns a glyph is drawn in this frame."""
+        self._age[cols] = 0
+
+    def rects(self):
+        """Dirty strips for this frame, merged into runs; ages every strip."""
+        if self._full:
+            self._full = False
+            dirty = np.ones(self.columns, dtype=bool)
+        else:
+            dirty = self._age <= self.ttl
+        np.minimum(self._age + 1, self.ttl + 1, out=self._age)
+
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], dirty.view(np.int8), [0]))))
+        w = self.col_width
+        return [pygame.Rect(self.x0 + a * w, 0, (b - a) * w, self.height)
+                for a, b in zip(edges[::2].tolist(), edges[1::2].tolist())]
+
+    @staticmethod
+    def fade(screen, layer, rects):
+        # dim only the strips that still hold something
+        for r in rects:
+            screen.blit(layer, r, r)
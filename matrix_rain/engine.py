@@ -0,0 +1,385 @@
+import os
+import time
+
+import pygame
+
+from .analysis import EdgeAnalyzer
+from .camera import open_camera
+from .capture import LatestFrameReader
+from .glyphs import clear_atlases, get_atlas
+from .governor import QualityGovernor, ladder_for, scale_config
+from .mjpeg import MjpegServer
+from .presets import get_preset
+from .recording import RecordingCapture
+from .sampling import spans
+from .scenes import REFERENCE_FPS, SCENES
+from .scheduler import LAYOUTS, AnalysisClock, MultiClock
+from .timing import FrameTimer
+from .trace import Tracer
+from .worker import ProcessAnalyzer
+
+
+def build_scene(config, size, rate, seed=None):
+    """The preset's scene on a `size` canvas, animated at `rate` frames per second."""
+    width, _ = size
+    if config.get("font_size"):
+        glyph = config["font_size"]
+    elif config.get("columns"):
+        glyph = width // config["columns"]
+    else:
+        glyph = config["cell"]
+    font, bold = config.get("font", ("Consolas", True))
+    atlas = get_atlas(font, glyph, config["charset"], bold=bold)
+    return SCENES[config["scene"]](config, size, atlas, rate=rate, seed=seed)
+
+
+class Engine:
+    """One capture → analyse → simulate → render → present loop for every preset.
+
+    Rendering and the rain simulation run at `fps`. Edge analysis runs on
+    its own clock (an AnalysisClock, threaded by default) and its grid is
+    blended into every rendered frame, so slow analysis lowers how often
+    the silhouette updates, not how smoothly the rain falls.
+
+    preset:         name in PRESETS
+    size:           (width, height) of the window; None for the monitor
+                    size when the preset is fullscreen, else 800 × 600
+    capture:        any cv2.VideoCapture-like source, or a list of them
+                    for several cameras; default opens the preset's
+                    camera (or list of cameras) with camera.open_camera
+                    and prints the mode each got (kept in `camera_modes`)
+    fps:            render rate cap for clock.tick, or None to run uncapped
+    analysis_fps:   edge analyses per second at most, or None for every
+                    new camera frame
+    blend / tau:    AnalysisClock blending of analysis results
+    threaded:       analyse on a thread instead of inline in the loop
+    processes:      run each camera's analysis in a worker process (a
+                    worker.ProcessAnalyzer) that its analysis thread
+                    waits on, so analysis runs outside this interpreter
+                    on its own core; needs `threaded`, and the program's
+                    entry point guarded by if __name__ == "__main__"
+    analysis_cell:  EdgeAnalyzer analysis_cell (None = full resolution)
+    timing_hud / timing_csv:
+                    FrameTimer overlay and per-frame CSV
+    seed:           seed for the scene's random streams, None for a fresh run
+    target_fps:     frame rate for a QualityGovernor to hold by trading
+                    away detail (see set_quality), or None to leave the
+                    preset as it is
+    trace:          path to write a Chrome trace of the run to on close;
+                    the trace.Tracer (`tracer`) also keeps the
+                    capture-to-photon latency of every shown frame
+    record / record_frames:
+                    .npy path to record the last `record_frames` camera
+                    frames to (a RecordingCapture), for replay with
+                    recording.MemmapCapture; with several cameras each
+                    gets its own file, numbered like site-0.npy
+    serve:          port (or (host, port)) to stream the window on as
+                    MJPEG over HTTP with an mjpeg.MjpegServer (`server`),
+                    for viewing elsewhere; a bare port listens on
+                    localhost only
+    **overrides:    replace any preset key for this run
+
+    With several cameras each one has its own LatestFrameReader and its
+    own threaded AnalysisClock, and a scheduler.MultiClock combines their
+    grids as the preset's "camera_layout" says: "tile" gives each camera
+    an equal band of columns, left to right, as one camera per projector
+    would; "merge" analyses every camera over the whole grid and keeps
+    the brightest cell.
+
+    The stages are plain attributes built in open(): `readers` and
+    `analyses` (one LatestFrameReader and AnalysisClock per camera),
+    `reader` and `analyzer` (the first camera's), `analysis` (what the
+    loop samples: the AnalysisClock, or the MultiClock over them) and
+    `scene`. Scenes come from scenes.SCENES by the preset's "scene" key,
+    so a new look is a new scene class plus a preset.
+    """
+
+    def __init__(self, preset, size=None, capture=None, fps=60, analysis_fps=None,
+                 blend="exp", tau=0.05, threaded=True, processes=False, analysis_cell=4,
+                 timing_hud=False, timing_csv=None, seed=None, target_fps=None, trace=None,
+                 record=None, record_frames=600, serve=None, **overrides):
+        self.name = preset
+        self.config = get_preset(preset)
+        self.config.update(overrides)
+        self.size = size
+        self.capture = capture
+        self.fps = fps
+        self.analysis_fps = analysis_fps
+        self.blend = blend
+        self.tau = tau
+        if processes and not threaded:
+            raise ValueError("processes=True needs threaded=True: inline analysis "
+                             "would wait on the worker in the render loop")
+        self.threaded = threaded
+        self.processes = processes
+        self.analysis_cell = analysis_cell
+        self.timing_hud = timing_hud
+        self.timing_csv = timing_csv
+        self.seed = seed
+        self.trace = trace
+        self.tracer = None
+        self.record = record
+        self.record_frames = record_frames
+        self.camera_modes = []
+        self.serve = serve
+        self.server = None
+        self.governor = None
+        if target_fps:
+            self.governor = QualityGovernor(target_fps, ladder_for(self.config, analysis_cell))
+        self.quality = {}                 # governor factors in effect
+
+        self.screen = None
+        self.captures = []
+        self.readers = []
+        self.reader = None
+        self.analyses = []
+        self.analyzer = None
+        self.analysis = None
+        self.scene = None
+        self.timer = None
+        self.clock = None
+        self.frames = 0
+        self._last = None
+        self._flip = False                # next present must be a full flip
+
+    def open(self):
+        config = self.config
+        pygame.init()
+        if config.get("fullscreen"):
+            if self.size is None:
+                info = pygame.display.Info()
+                self.size = (info.current_w, info.current_h)
+            self.screen = pygame.display.set_mode(self.size, pygame.FULLSCREEN)
+        else:
+            self.size = self.size or (800, 600)
+            self.screen = pygame.display.set_mode(self.size)
+        pygame.display.set_caption(config["title"])
+        self.scene = build_scene(config, self.size, self.fps or REFERENCE_FPS, seed=self.seed)
+
+        if config.get("camera_layout", "tile") not in LAYOUTS:
+            raise ValueError(f"camera_layout must be one of {LAYOUTS}, "
+                             f"not {config['camera_layout']!r}")
+        if self.capture is None:
+            self._open_cameras(config)
+        elif isinstance(self.capture, (list, tuple)):
+            self.captures = list(self.capture)
+        else:
+            self.captures = [self.capture]
+        several = len(self.captures) > 1
+        if self.record:
+            root, ext = os.path.splitext(self.record)
+            self.captures = [
+                RecordingCapture(capture, f"{root}-{k}{ext}" if several else self.record,
+                                 self.record_frames)
+                for k, capture in enumerate(self.captures)]
+        self.readers = [LatestFrameReader(capture, f"capture {k}" if several else "capture")
+                        for k, capture in enumerate(self.captures)]
+        self.reader = self.readers[0]
+        self.timer = FrameTimer(csv_path=self.timing_csv)
+        if self.trace:
+            self.tracer = Tracer()
+            self.timer.tracer = self.tracer
+            for reader in self.readers:
+                reader.tracer = self.tracer
+        for reader in self.readers:
+            reader.start()
+        self._start_analysis(config, self.analysis_cell)
+        if self.serve is not None:
+            host, port = self.serve if isinstance(self.serve, tuple) else ("127.0.0.1", self.serve)
+            self.server = MjpegServer(host, port).start()
+            print(f"streaming on {self.server.url}")
+        self.clock = pygame.time.Clock()
+        return self
+
+    def _open_cameras(self, config):
+        cameras = config.get("camera", 0)
+        if not isinstance(cameras, (list, tuple)):
+            cameras = [cameras]
+        self.captures, self.camera_modes = [], []
+        try:
+            for camera in cameras:
+                # the camera's own mode, not the window size: the analyzer rescales anyway
+                capture, mode = open_camera(camera, config.get("camera_size"),
+                                            config.get("camera_fps"))
+                self.captures.append(capture)
+                self.camera_modes.append(mode)
+                print(f"camera {camera}: {mode}")
+        except IOError:
+            for capture in self.captures:
+                capture.release()
+            self.captures = []
+            raise
+
+    def _stop_analysis(self):
+        if self.analysis is not None:
+            self.analysis.stop()
+        for clock in self.analyses:
+            if isinstance(clock.analyzer, ProcessAnalyzer):
+                clock.analyzer.close()
+
+    def _start_analysis(self, config, analysis_cell):
+        self._stop_analysis()
+        rows, cols = self.scene.grid
+        cell_w = self.scene.cell[0]
+        width, height = self.size
+        several = len(self.readers) > 1
+        columns = None
+        if several and config.get("camera_layout", "tile") == "tile":
+            columns = spans(cols, len(self.readers))
+
+        self.analyses = []
+        for k, reader in enumerate(self.readers):
+            size, grid = self.size, self.scene.grid
+            if columns is not None:
+                # this camera's band of columns and the display pixels under it
+                band = columns[k + 1] - columns[k]
+                size, grid = (band * cell_w, height), (rows, band)
+            analyzer = EdgeAnalyzer(size, grid, self.scene.cell,
+                                    analysis_cell=analysis_cell, **config["analysis"])
+            analyzer.timer = self.timer
+            if self.processes:
+                analyzer = ProcessAnalyzer(analyzer)
+            clock = AnalysisClock(analyzer, reader, rate=self.analysis_fps, blend=self.blend,
+                                  tau=self.tau, threaded=self.threaded,
+                                  name=f"analysis {k}" if several else "analysis")
+            if clock.timer is not None:
+                clock.timer.tracer = self.tracer
+            self.analyses.append(clock)
+        self.analyzer = self.analyses[0].analyzer
+        if self.processes:
+            self.analyzer = self.analyzer.analyzer
+        if several:
+            self.analysis = MultiClock(self.analyses, self.scene.grid, columns)
+        else:
+            self.analysis = self.analyses[0]
+        self.analysis.start()
+
+    def set_quality(self, factors):
+        """Scale the preset's costly knobs by QualityGovernor.factors().
+
+        Trail length and mutation are retuned in the running scene. A new
+        analysis resolution or halo restarts the analysis, and a new cell
+        size rebuilds the scene as well.
+        """
+        old, self.quality = self.quality, dict(factors)
+        config = scale_config(self.config, factors)
+
+        def changed(knob):
+            return factors.get(knob, 1.0) != old.get(knob, 1.0)
+
+        analysis_cell = self.analysis_cell
+        if factors.get("analysis", 1.0) != 1.0:
+            # None analyses at display size: one pixel per display pixel
+            cell = analysis_cell or self.scene.cell[0]
+            analysis_cell = max(1, round(cell * factors["analysis"]))
+
+        if changed("cell"):
+            self.scene = build_scene(config, self.size, self.fps or REFERENCE_FPS,
+                                     seed=self.seed)
+            self.screen.fill((0, 0, 0))
+            self._flip = True
+            self._start_analysis(config, analysis_cell)
+        else:
+            self.scene.retune(config)
+            if changed("analysis") or changed("halo"):
+                self._start_analysis(config, analysis_cell)
+
+    def step(self):
+        """Run one frame; False once the window is closed or the camera has stalled."""
+        start = time.perf_counter()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN and event.key in (pygame.K_q, pygame.K_ESCAPE):
+                return False
+
+        timer = self.timer
+        stall = self.config.get("stall")
+        if stall is not None and max(reader.age() for reader in self.readers) > stall:
+            print("Camera stopped")
+            return False
+        now = time.perf_counter()
+        field = self.analysis.sample(now)
+        if field is None:
+            # nothing analysed yet
+            self.reader.wait(timeout=0.1)
+            return True
+        timer.frame = self.analysis.seq
+        timer.lap("blend")
+
+        # preset speeds are per REFERENCE_FPS frame; cap the catch-up after a hitch
+        steps = 1.0 if self._last is None else min(now - self._last, 0.1) * REFERENCE_FPS
+        self._last = now
+        self.scene.update(field, steps)
+        timer.lap("simulate")
+        rects = self.scene.draw(self.screen)
+        timer.lap("render")
+
+        if self.timing_hud:
+            huds = [timer.draw_hud(self.screen)]
+            for clock in self.analyses:
+                if clock.timer is not None:
+                    huds.append(clock.timer.draw_hud(self.screen, (8, huds[-1].bottom + 4)))
+            if rects is not None:
+                rects.extend(huds)
+        if rects is None or self._flip:
+            pygame.display.flip()
+            self._flip = False
+        else:
+            pygame.display.update(rects)
+        presented = timer.lap("present")
+        if self.tracer is not None:
+            for k, clock in enumerate(self.analyses):
+                self.tracer.shown(clock.seq, clock.captured, presented, k)
+        if self.server is not None:
+            self.server.publish_surface(self.screen)
+            timer.lap("stream")
+        if self.governor is not None:
+            done = time.perf_counter()
+            if self.governor.update(done - start, done):
+                self.set_quality(self.governor.factors())
+            timer.lap("govern")
+        self.clock.tick(self.fps or 0)
+        timer.lap("wait")
+        timer.end_frame()
+        self.frames += 1
+        return True
+
+    def run(self, frames=None):
+        """Open if needed and loop until quit (or for `frames` frames); always closes."""
+        if self.screen is None:
+            self.open()
+        try:
+            while self.step():
+                if frames is not None and self.frames >= frames:
+                    break
+        finally:
+            self.close()
+        return self
+
+    def close(self):
+        self._stop_analysis()
+        for reader in self.readers:
+            reader.stop()
+        self.readers = []
+        self.reader = None
+        if self.server is not None:
+            self.server.stop()
+            self.server = None
+        if self.timer is not None:
+            self.timer.close()
+        if self.tracer is not None:
+            self.tracer.export(self.trace)
+        for capture in self.captures:
+            capture.release()
+        self.captures = []
+        # the cached atlases' fonts don't outlive pygame
+        clear_atlases()
+        pygame.quit()
+        self.screen = None
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,106 @@
+import numpy as np
+import pygame
+
+# -----------------------
+# CHARSETS
+# -----------------------
+DIGITS = "0123456789"
+KATAKANA = "日ﾊﾐﾋｰｳｼﾅﾓﾆｻﾜﾂｵﾘｱﾎﾃﾏｹﾒｴｶｷﾑﾕﾗｾﾈｽﾀﾇﾍ"
+SYMBOLS = ":・.=*+-<>"
+MATRIX = DIGITS + KATAKANA + SYMBOLS
+
+LEVELS = 32                       # quantized brightness steps per ramp
+
+# Atlases are shared between every renderer that asks for the same font
+_atlases = {}
+
+
+def clear_atlases():
+    """Forget every cached atlas; their fonts die with pygame.quit()."""
+    _atlases.clear()
+
+
+def get_atlas(font_name, size, charset, bold=True, levels=LEVELS):
+    if not pygame.font.get_init():
+        # pygame.font.quit() freed the cached fonts
+        clear_atlases()
+    key = (font_name, size, bold, charset, levels)
+    atlas = _atlases.get(key)
+    if atlas is None:
+        if not _atlases:
+            # pygame forgets its quit hooks once they've run, so hook each time
+            pygame.register_quit(clear_atlases)
+        atlas = GlyphAtlas(font_name, size, charset, bold, levels)
+        _atlases[key] = atlas
+    return atlas
+
+
+class GlyphAtlas:
+    """Every glyph of a charset pre-rendered at quantized brightness levels.
+
+    Two ramps are built at startup: green (0, g, 0) for trails and
+    white (w, 255, w) for stream heads. Any other colour is rendered once
+    on first use and cached alongside them.
+    """
+
+    def __init__(self, font_name, size, charset, bold=True, levels=LEVELS):
+        self.font = pygame.font.SysFont(font_name, size, bold=bold)
+        self.size = size
+        self.levels = levels
+        # charsets may repeat glyphs to weight random choice; render each once
+        self.chars = "".join(dict.fromkeys(charset))
+        self.index = {ch: i for i, ch in enumerate(self.chars)}
+
+        ramp = [round(k * 255 / (levels - 1)) for k in range(levels)]
+        self._green = [[self._render(ch, (0, g, 0)) for g in ramp] for ch in self.chars]
+        self._white = [[self._render(ch, (w, 255, w)) for w in ramp] for ch in self.chars]
+        self._colors = {}
+
+    def _render(self, ch, color):
+        surf = self.font.render(ch, True, color)
+        if pygame.display.get_surface() is not None:
+            surf = surf.convert_alpha()
+        return surf
+
+    def _slot(self, ch):
+        i = self.index.get(ch)
+        if i is None:
+            # glyph outside the charset: extend every ramp once
+            i = len(self.chars)
+            self.chars += ch
+            self.index[ch] = i
+            ramp = [round(k * 255 / (self.levels - 1)) for k in range(self.levels)]
+            self._green.append([self._render(ch, (0, g, 0)) for g in ramp])
+            self._white.append([self._render(ch, (w, 255, w)) for w in ramp])
+            for color, surfs in self._colors.items():
+                surfs.append(self._render(ch, color))
+        return i
+
+    def level(self, value):
+        # 0–255 → nearest ramp step
+        value = min(255, max(0, int(value)))
+        return (value * (self.levels - 1) + 127) // 255
+
+    def green(self, ch, g):
+        return self._green[self._slot(ch)][self.level(g)]
+
+    def white(self, ch, w=255):
+        return self._white[self._slot(ch)][self.level(w)]
+
+    def masks(self, width, height):
+        """Coverage bitmaps (glyphs, height, width) uint8, cropped to one cell."""
+        out = np.zeros((len(self.chars), height, width), dtype=np.uint8)
+        for i, ramp in enumerate(self._white):
+            alpha = pygame.surfarray.array_alpha(ramp[-1]).T
+            h = min(height, alpha.shape[0])
+            w = min(width, alpha.shape[1])
+            out[i, :h, :w] = alpha[:h, :w]
+        return out
+
+    def colored(self, ch, color):
+        i = self._slot(ch)
+        surfs = self._colors.get(color)
+        if surfs is None:
+            surfs = [self._render(c, color) for c in self.chars]
+            self._colors[color] = surfs
+        return surfs[i]
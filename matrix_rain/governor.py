@@ -0,0 +1,153 @@
+# Quality steps down from the preset, least visible first. Each is a
+# (knob, factor) applied on top of every step before it:
+#
+#   mutate    glyph mutation chance (stream scenes)
+#   length    trail length (stream and trail scenes)
+#   analysis  analysis pixels per cell, i.e. edge-detection resolution
+#   halo      halo sigma
+#   cell      glyph cell size; fewer, bigger cells (rebuilds the scene)
+LADDER = [
+    ("mutate", 0.5),
+    ("analysis", 0.5),
+    ("length", 0.75),
+    ("halo", 0.5),
+    ("analysis", 0.5),
+    ("mutate", 0.5),
+    ("length", 0.75),
+    ("cell", 1.25),
+    ("cell", 1.25),
+]
+KNOBS = ("mutate", "length", "analysis", "halo", "cell")
+
+
+def ladder_for(config, analysis_cell, ladder=LADDER):
+    """`ladder` without the steps that would change nothing for this preset."""
+    rain = config.get("rain", {})
+    useful = {"cell"}
+    if rain.get("mutate"):
+        useful.add("mutate")
+    if "length" in config or "length" in rain:
+        useful.add("length")
+    if config["analysis"].get("halo"):
+        useful.add("halo")
+    if analysis_cell is None or analysis_cell > 1:
+        useful.add("analysis")
+    return [step for step in ladder if step[0] in useful]
+
+
+def _scaled(span, factor):
+    lo, hi = span
+    return max(1, round(lo * factor)), max(1, round(hi * factor))
+
+
+def scale_config(config, factors):
+    """A copy of a preset config with the governor's length, mutate, halo
+    and cell factors applied ("analysis" is the Engine's analysis_cell)."""
+    config = dict(config)
+    cell = factors.get("cell", 1.0)
+    if cell != 1.0:
+        for key in ("cell", "font_size", "col_width", "row_pitch"):
+            if config.get(key):
+                config[key] = max(1, round(config[key] * cell))
+        if config.get("columns"):
+            config["columns"] = max(1, round(config["columns"] / cell))
+
+    analysis = config["analysis"] = dict(config["analysis"])
+    if analysis.get("halo"):
+        analysis["halo"] *= factors.get("halo", 1.0)
+
+    length = factors.get("length", 1.0)
+    if "length" in config:
+        config["length"] = _scaled(config["length"], length)
+    if "rain" in config:
+        rain = config["rain"] = dict(config["rain"])
+        rain["length"] = _scaled(rain["length"], length)
+        if rain.get("mutate"):
+            rain["mutate"] *= factors.get("mutate", 1.0)
+    return config
+
+
+class QualityGovernor:
+    """Holds a target frame rate by stepping down LADDER and back up.
+
+    Feed it the busy time of every frame (everything but the wait for
+    the frame cap) with update(); it keeps a smoothed value and answers
+    True when it has changed level, after which factors() holds the new
+    per-knob multipliers.
+
+    Three things keep it from oscillating. It steps down when the
+    smoothed time is over `down` × the budget but only back up under
+    `up` × the budget, and only once that has held for `up_after`
+    seconds. After any change it waits `settle` seconds for the new
+    level to show in the timings. And a level it had to leave for being
+    too slow is retried only after twice as long as last time.
+
+    target_fps: frame rate to hold
+    ladder:     (knob, factor) steps, see LADDER
+    smoothing:  weight of a new frame in the running average
+    log:        called with a line describing every change, or None
+    """
+
+    def __init__(self, target_fps, ladder=LADDER, down=1.0, up=0.8, settle=1.0,
+                 up_after=3.0, smoothing=0.1, log=print):
+        self.budget = 1.0 / target_fps
+        self.ladder = ladder
+        self.down = down
+        self.up = up
+        self.settle = settle
+        self.up_after = up_after
+        self.smoothing = smoothing
+        self.log = log
+        self.level = 0                    # steps taken down the ladder
+        self.average = None
+        self._hold = None                 # no decisions before this time
+        self._headroom = None             # since when the average has been under `up`
+        self._retry = {}                  # level: seconds to wait before climbing back to it
+
+    def factors(self):
+        """{knob: multiplier} for the current level; 1.0 for untouched knobs."""
+        factors = dict.fromkeys(KNOBS, 1.0)
+        for knob, factor in self.ladder[:self.level]:
+            factors[knob] *= factor
+        return factors
+
+    def update(self, frame_time, now):
+        """Account one frame's busy seconds at perf_counter() `now`; True if the level changed."""
+        if self.average is None:
+            self.average = frame_time
+        else:
+            self.average += self.smoothing * (frame_time - self.average)
+        if self._hold is None:
+            # let startup hitches pass before judging
+            self._hold = now + self.settle
+        if now < self._hold:
+            return False
+
+        if self.average > self.down * self.budget:
+            self._headroom = None
+            if self.level < len(self.ladder):
+                # coming back here will need a longer spell of headroom
+                self._retry[self.level] = 2 * self._retry.get(self.level, self.up_after / 2)
+                return self._change(self.level + 1, now)
+        elif self.average < self.up * self.budget and self.level > 0:
+            if self._headroom is None:
+                self._headroom = now
+            if now - self._headroom >= self._retry.get(self.level - 1, self.up_after):
+                return self._change(self.level - 1, now)
+        else:
+            self._headroom = None
+        return False
+
+    def _change(self, level, now):
+        step = self.ladder[max(level, self.level) - 1]
+        if self.log is not None:
+            knob, factor = step
+            verb = "down" if level > self.level else "up"
+            self.log(f"quality {verb} to level {level}/{len(self.ladder)}: "
+                     f"{knob} x{factor if verb == 'down' else 1 / factor:.3g}, frame "
+                     f"{self.average * 1000:.1f} ms for a {self.budget * 1000:.1f} ms budget")
+        self.level = level
+        self.average = None
+        self._headroom = None
+        self._hold = now + self.settle
+        return True
@@ -0,0 +1,276 @@
+import os
+
+import cv2
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Per-cell loops that NumPy can only do through whole-grid temporaries,
+# each in two backends that do the same float32 arithmetic in the same
+# order and so give bit-identical results:
+#
+#   numpy  array expressions (always available)
+#   numba  plain loops compiled with numba.njit on first call and cached
+#          next to this file, one pass over the data with no temporaries
+#
+# Numba is optional. The default is numba when it imports, else numpy;
+# set MATRIX_RAIN_KERNELS=numpy (or call use("numpy")) to force the
+# array path. Callers look kernels up as kernels.<name> on every call,
+# so use() takes effect everywhere at once.
+BACKENDS = ("numpy", "numba")
+
+
+# ---- numpy ----
+
+def _cell_means_numpy(img, ys, xs, out):
+    block = img[ys[0]:ys[-1], xs[0]:xs[-1]]
+    sums = np.add.reduceat(block, ys[:-1] - ys[0], axis=0, dtype=np.float32)
+    sums = np.add.reduceat(sums, xs[:-1] - xs[0], axis=1)
+    np.divide(sums, np.outer(np.diff(ys), np.diff(xs)), out=out)
+    return out
+
+
+def _trail_levels_numpy(field, heads, lengths, edge_floor, top, out, scratch):
+    rows = field.shape[0]
+    # cells behind each head: 0 at the head, 1 above it, ...
+    behind = (heads.astype(int) - np.arange(rows)[:, None]) % rows
+    lit = behind < lengths
+
+    # head → tail fade, scaled by how close the cell is to an edge
+    bright = scratch
+    np.multiply(field, 1.0 - edge_floor, out=bright)
+    bright += edge_floor
+    bright *= 1.0 - behind / lengths
+    np.minimum(bright, 1.0, out=bright)
+
+    np.rint(bright * (top - 1), out=bright)
+    out[...] = bright
+    out += 1
+    out[~lit] = 0
+    return out
+
+
+def _composite_numpy(frame, tiles, index, fade_lut, scratch):
+    rows, cols = index.shape
+    _, cell_h, cell_w, _ = tiles.shape
+    # the framebuffer seen as (rows, cols, cell_h, cell_w, 3)
+    cells = frame.reshape(rows, cell_h, cols, cell_w, 3).transpose(0, 2, 1, 3, 4)
+    if scratch is None:
+        scratch = np.empty((rows, cols, cell_h, cell_w, 3), np.uint8)
+    np.take(tiles, index, axis=0, out=scratch, mode="clip")
+    if fade_lut is not None:
+        cv2.LUT(frame, fade_lut, dst=frame)
+        np.maximum(cells, scratch, out=cells)
+    else:
+        cells[...] = scratch
+    return frame
+
+
+# ---- numba ----
+# Written against the numpy versions above: float32 where they compute
+# in float32, float64 where NumPy promotes, and np.add.reduceat's
+# summation order (the first element, then a pairwise sum of the rest).
+
+def _block(a, lo, n, out):
+    # numpy's pairwise_sum of rows a[lo:lo + n], n <= 128, into float32
+    # `out`, for every column at once: the order depends only on n
+    width = out.shape[0]
+    if n < 8:
+        out[:] = -0.0
+        for i in range(lo, lo + n):
+            for x in range(width):
+                out[x] += np.float32(a[i, x])
+        return
+    r = np.empty((8, width), np.float32)
+    for j in range(8):
+        for x in range(width):
+            r[j, x] = a[lo + j, x]
+    i = 8
+    while i < n - n % 8:
+        for j in range(8):
+            for x in range(width):
+                r[j, x] += np.float32(a[lo + i + j, x])
+        i += 8
+    for x in range(width):
+        out[x] = ((r[0, x] + r[1, x]) + (r[2, x] + r[3, x])) + \
+                 ((r[4, x] + r[5, x]) + (r[6, x] + r[7, x]))
+    while i < n:
+        for x in range(width):
+            out[x] += np.float32(a[lo + i, x])
+        i += 1
+
+
+def _pairwise(a, lo, n, out):
+    # longer runs: numpy halves them (at a multiple of 8) and adds the
+    # halves. Walked with a stack, as numba can't cache recursion.
+    if n <= 128:
+        _block(a, lo, n, out)
+        return
+    sums = np.empty((32, out.shape[0]), np.float32)     # one per tree depth
+    los = np.empty(32, np.int64)
+    ns = np.empty(32, np.int64)
+    phase = np.zeros(32, np.int64)
+    depth = 0
+    los[0], ns[0] = lo, n
+    while depth >= 0:
+        half = ns[depth] // 2
+        half -= half % 8
+        if ns[depth] <= 128:
+            _block(a, los[depth], ns[depth], sums[depth])
+            depth -= 1
+        elif phase[depth] == 0:
+            phase[depth] = 1
+            los[depth + 1], ns[depth + 1], phase[depth + 1] = los[depth], half, 0
+            depth += 1
+        elif phase[depth] == 1:
+            sums[depth] = sums[depth + 1]
+            phase[depth] = 2
+            los[depth + 1], ns[depth + 1], phase[depth + 1] = los[depth] + half, ns[depth] - half, 0
+            depth += 1
+        else:
+            sums[depth] += sums[depth + 1]
+            depth -= 1
+    out[:] = sums[0]
+
+
+def _reduce(a, lo, hi):
+    # one np.add.reduceat segment of a contiguous float32 run
+    total = a[lo]
+    if hi - lo > 1:
+        rest = np.empty(1, np.float32)
+        _pairwise(a[lo + 1:hi].reshape(hi - lo - 1, 1), 0, hi - lo - 1, rest)
+        total += rest[0]
+    return total
+
+
+def _cell_means_loops(img, ys, xs, out):
+    block = img[:, xs[0]:xs[-1]]
+    width = block.shape[1]
+    sums = np.empty(width, np.float32)
+    rest = np.empty(width, np.float32)
+    for r in range(len(ys) - 1):
+        # column sums down the band: the first row plus the rest, pairwise
+        for x in range(width):
+            sums[x] = block[ys[r], x]
+        if ys[r + 1] - ys[r] > 1:
+            _pairwise(block, ys[r] + 1, ys[r + 1] - ys[r] - 1, rest)
+            for x in range(width):
+                sums[x] += rest[x]
+        for c in range(len(xs) - 1):
+            total = _reduce(sums, xs[c] - xs[0], xs[c + 1] - xs[0])
+            out[r, c] = total / ((ys[r + 1] - ys[r]) * (xs[c + 1] - xs[c]))
+    return out
+
+
+def _trail_levels_loops(field, heads, lengths, scale, floor, top, out):
+    rows, cols = field.shape
+    steps = np.float32(top - 1)
+    for c in range(cols):
+        head = int(heads[c])
+        length = lengths[c]
+        for r in range(rows):
+            behind = (head - r) % rows
+            if behind >= length:
+                out[r, c] = 0
+                continue
+            bright = np.float32(field[r, c] * scale) + floor
+            bright = np.float32(bright * (1.0 - behind / length))
+            bright = min(bright, np.float32(1.0))
+            out[r, c] = int(np.rint(bright * steps)) + 1
+    return out
+
+
+def _composite_loops(frame, tiles, index, fade_lut, fading):
+    # frame as (height, width * depth), tiles as (count, cell_h, cell_w * depth)
+    rows, cols = index.shape
+    count, cell_h, span = tiles.shape
+    for r in range(rows):
+        for c in range(cols):
+            tile = tiles[min(max(index[r, c], 0), count - 1)]
+            x0 = c * span
+            for y in range(cell_h):
+                line = frame[r * cell_h + y]
+                src = tile[y]
+                if fading:
+                    for i in range(span):
+                        line[x0 + i] = max(fade_lut[line[x0 + i]], src[i])
+                else:
+                    for i in range(span):
+                        line[x0 + i] = src[i]
+    return frame
+
+
+if numba is not None:
+    _block = numba.njit(cache=True)(_block)
+    _pairwise = numba.njit(cache=True)(_pairwise)
+    _reduce = numba.njit(cache=True)(_reduce)
+    _cell_means_loops = numba.njit(cache=True)(_cell_means_loops)
+    _trail_levels_loops = numba.njit(cache=True)(_trail_levels_loops)
+    _composite_loops = numba.njit(cache=True)(_composite_loops)
+
+
+def _cell_means_numba(img, ys, xs, out):
+    return _cell_means_loops(img, ys, xs, out)
+
+
+def _trail_levels_numba(field, heads, lengths, edge_floor, top, out, scratch):
+    # the numpy path multiplies in the field's precision, then adds in float32
+    scale = field.dtype.type(1.0 - edge_floor)
+    return _trail_levels_loops(field, heads, lengths, scale, np.float32(edge_floor), top, out)
+
+
+def _composite_numba(frame, tiles, index, fade_lut, scratch):
+    rows = frame.reshape(frame.shape[0], -1)
+    tiles = tiles.reshape(tiles.shape[0], tiles.shape[1], -1)
+    if fade_lut is None:
+        _composite_loops(rows, tiles, index, np.arange(256, dtype=np.uint8), False)
+    else:
+        _composite_loops(rows, tiles, index, fade_lut, True)
+    return frame
+
+
+# ---- dispatch ----
+
+_KERNELS = {
+    "numpy": (_cell_means_numpy, _trail_levels_numpy, _composite_numpy),
+    "numba": (_cell_means_numba, _trail_levels_numba, _composite_numba),
+}
+
+backend = None
+cell_means = trail_levels = composite = None
+
+
+def use(name):
+    """Switch every kernel to the `name` backend; returns the previous one.
+
+    The kernels, whichever backend is in use:
+
+    cell_means(img, ys, xs, out)
+        mean of `img` over every cell between the bounds `ys` × `xs`
+        (absolute pixel bounds, as sampling.spans) into float32 `out`
+    trail_levels(field, heads, lengths, edge_floor, top, out, scratch)
+        TrailScene's LUT levels: 0 off the trails, else 1 + the trail
+        fade times the edge boost (edge_floor + field × (1 - edge_floor))
+        scaled to top - 1; `scratch` is a float32 grid the numpy
+        backend works in
+    composite(frame, tiles, index, fade_lut, scratch)
+        GridCompositor's frame: tile index[r, c] (clipped to the tiles)
+        into every cell of `frame`, over the old frame dimmed through
+        `fade_lut` with a lighten blend, or replacing it when fade_lut
+        is None; `scratch` is the numpy backend's gather buffer
+    """
+    global backend, cell_means, trail_levels, composite
+    if name not in _KERNELS:
+        raise ValueError(f"unknown kernel backend {name!r}; choose from {', '.join(BACKENDS)}")
+    if name == "numba" and numba is None:
+        raise ImportError("the numba kernel backend needs numba installed")
+    previous = backend
+    backend = name
+    cell_means, trail_levels, composite = _KERNELS[name]
+    return previous
+
+
+use(os.environ.get("MATRIX_RAIN_KERNELS") or ("numpy" if numba is None else "numba"))
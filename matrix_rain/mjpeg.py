@@ -0,0 +1,272 @@
+import asyncio
+import socket
+import threading
+import time
+
+import cv2
+import numpy as np
+import pygame
+
+BOUNDARY = b"frame"
+STREAM_PATHS = ("/", "/stream.mjpg")
+FRAME_PATH = "/frame.jpg"
+REQUEST_TIMEOUT = 5.0             # seconds to wait for a client's request headers
+FRAME_TIMEOUT = 2.0               # seconds a /frame.jpg waits for a frame
+SEND_BUFFER = 1 << 18             # bytes the kernel may queue per client: stale frames
+
+
+def _response(status, content_type, length=None):
+    head = [f"HTTP/1.1 {status}", f"Content-Type: {content_type}",
+            "Cache-Control: no-cache, no-store", "Connection: close"]
+    if length is not None:
+        head.append(f"Content-Length: {length}")
+    return ("\r\n".join(head) + "\r\n\r\n").encode()
+
+
+class MjpegServer:
+    """Streams published frames to HTTP clients as multipart MJPEG.
+
+    The server runs an asyncio loop on its own thread. The render loop
+    calls publish() with each frame; that copies the frame into a pending
+    buffer and returns, and the loop's encoder JPEG-encodes it once (off
+    the loop, in an executor thread) for every client. Each client is sent
+    the newest JPEG whenever its socket has taken the last one, so a slow
+    client skips frames (counted in `dropped`) and never holds up the
+    encoder, the other clients or the render loop. Each client's socket
+    send buffer is capped at SEND_BUFFER, so what a slow one falls behind
+    by is a frame or two, not however much the kernel would queue.
+
+    Nothing is copied or encoded while no client is connected, and frames
+    published faster than `fps` are skipped.
+
+    host:    address to listen on; the default only accepts this machine
+    port:    TCP port, 0 for any free one (the one bound is in `port`)
+    quality: JPEG quality, 0-100
+    fps:     frames a second to stream at most, or None for every frame
+
+    GET / or /stream.mjpg is the stream (open it in a browser, or an
+    <img> tag); GET /frame.jpg is the next frame as a single JPEG.
+    """
+
+    def __init__(self, host="127.0.0.1", port=8080, quality=80, fps=30):
+        self.host = host
+        self.port = port
+        self.quality = quality
+        self.fps = fps
+        self.clients = 0                  # connections waiting for frames
+        self.frames = 0                   # frames encoded
+        self.sent = 0                     # JPEGs written to clients
+        self.dropped = 0                  # frames clients were too slow to be sent
+        self.skipped = 0                  # published frames replaced before encoding
+        self.jpeg = None                  # newest encoded frame
+        self.encode_ms = 0.0              # time the newest took to encode
+
+        self._lock = threading.Lock()
+        self._pending = None              # copy of the newest published frame
+        self._encoding = None             # frame being encoded
+        self._bgr = None
+        self._order = "BGR"               # of _pending
+        self._encoding_order = "BGR"
+        self._fresh = False               # _pending holds a frame not yet encoded
+        self._due = 0.0
+        self._loop = None
+        self._thread = None
+        self._ready = threading.Event()
+        self._error = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}/"
+
+    def start(self):
+        """Bind and start serving.
+
+        Raises whatever stopped the server from starting, such as OSError
+        if the port can't be had.
+        """
+        self._thread = threading.Thread(target=self._serve, name="mjpeg", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+        if self._error is not None:
+            raise self._error
+        return self
+
+    def stop(self):
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    # ---- render loop side ----
+
+    def publish(self, image, order="BGR"):
+        """Offer a (height, width, 3) uint8 frame in `order` ("BGR" or "RGB").
+
+        Returns True if it was taken for streaming. Never waits on the
+        encoder or on clients.
+        """
+        if self._loop is None or not self.clients:
+            return False
+        now = time.perf_counter()
+        if self.fps:
+            if now < self._due:
+                return False
+            self._due = max(self._due + 1.0 / self.fps, now)
+        with self._lock:
+            if self._pending is None or self._pending.shape != image.shape:
+                self._pending = np.empty(image.shape, np.uint8)
+            np.copyto(self._pending, image)
+            if self._fresh:
+                self.skipped += 1
+            self._order = order
+            self._fresh = True
+        self._loop.call_soon_threadsafe(self._wake.set)
+        return True
+
+    def publish_surface(self, surface):
+        """publish() a pygame surface, such as the display."""
+        if self._loop is None or not self.clients:
+            return False
+        # (width, height, 3) RGB view of the pixels; transposed, not copied
+        view = pygame.surfarray.pixels3d(surface)
+        try:
+            return self.publish(view.transpose(1, 0, 2), "RGB")
+        finally:
+            del view
+
+    # ---- server thread ----
+
+    def _serve(self):
+        try:
+            asyncio.run(self._main())
+        except BaseException as exc:
+            self._error = exc
+        finally:
+            # start() waits for this even if the loop never got to bind
+            self._ready.set()
+
+    async def _main(self):
+        self._wake = asyncio.Event()
+        self._stop = asyncio.Event()
+        self._new = asyncio.Condition()
+        self._tasks = set()
+        server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = server.sockets[0].getsockname()[1]
+        self._loop = asyncio.get_running_loop()
+        self._ready.set()
+        encoder = asyncio.create_task(self._encoder())
+        async with server:
+            await self._stop.wait()
+            self._loop = None
+            # streams never end on their own; closing the server waits for them
+            encoder.cancel()
+            for task in list(self._tasks):
+                task.cancel()
+            await asyncio.gather(encoder, *self._tasks, return_exceptions=True)
+
+    def _encode(self):
+        image = self._encoding
+        if self._encoding_order == "RGB":
+            if self._bgr is None or self._bgr.shape != image.shape:
+                self._bgr = np.empty(image.shape, np.uint8)
+            cv2.cvtColor(image, cv2.COLOR_RGB2BGR, dst=self._bgr)
+            image = self._bgr
+        ok, data = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        if not ok:
+            raise ValueError("JPEG encoding failed")
+        return data.tobytes()
+
+    async def _encoder(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                if not self._fresh:
+                    continue
+                # take the frame; publish() fills the other buffer meanwhile
+                self._pending, self._encoding = self._encoding, self._pending
+                self._encoding_order = self._order
+                self._fresh = False
+            start = time.perf_counter()
+            jpeg = await loop.run_in_executor(None, self._encode)
+            async with self._new:
+                self.jpeg = jpeg
+                self.encode_ms = (time.perf_counter() - start) * 1000.0
+                self.frames += 1
+                self._new.notify_all()
+
+    async def _next(self, after):
+        """The first frame encoded after frame number `after`, and its number."""
+        async with self._new:
+            await self._new.wait_for(lambda: self.frames > after)
+            return self.jpeg, self.frames
+
+    async def _client(self, reader, writer):
+        self._tasks.add(asyncio.current_task())
+        try:
+            try:
+                head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), REQUEST_TIMEOUT)
+                method, path, _ = head.split(b"\r\n", 1)[0].decode("latin-1").split(" ", 2)
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError,
+                    asyncio.TimeoutError, ValueError):
+                return
+            path = path.split("?", 1)[0]
+            if method != "GET":
+                writer.write(_response("405 Method Not Allowed", "text/plain", 0))
+            elif path in STREAM_PATHS:
+                await self._stream(writer)
+            elif path == FRAME_PATH:
+                await self._frame(writer)
+            else:
+                writer.write(_response("404 Not Found", "text/plain", 0))
+            await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            # a client leaving, or stop(); either way the connection is done
+            pass
+        finally:
+            self._tasks.discard(asyncio.current_task())
+            writer.close()
+
+    async def _stream(self, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SEND_BUFFER)
+        writer.write(_response(
+            "200 OK", f"multipart/x-mixed-replace; boundary={BOUNDARY.decode()}"))
+        self.clients += 1
+        try:
+            sent = self.frames
+            while True:
+                jpeg, number = await self._next(sent)
+                self.dropped += number - sent - 1
+                sent = number
+                writer.write(b"--%s\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n"
+                             % (BOUNDARY, len(jpeg)))
+                writer.write(jpeg)
+                writer.write(b"\r\n")
+                self.sent += 1
+                # only this client waits for its socket; it gets the newest frame after
+                await writer.drain()
+        finally:
+            self.clients -= 1
+
+    async def _frame(self, writer):
+        self.clients += 1
+        try:
+            jpeg, _ = await asyncio.wait_for(self._next(self.frames), FRAME_TIMEOUT)
+        except asyncio.TimeoutError:
+            writer.write(_response("503 Service Unavailable", "text/plain", 0))
+            return
+        finally:
+            self.clients -= 1
+        writer.write(_response("200 OK", "image/jpeg", len(jpeg)))
+        writer.write(jpeg)
+        self.sent += 1
@@ -0,0 +1,133 @@
+import string
+
+from .glyphs import MATRIX
+
+# -----------------------
+# PRESETS
+# -----------------------
+# Each attempt script as an Engine configuration. Shared keys:
+#
+#   title        window caption
+#   scene        name in scenes.SCENES: "streams", "grid" or "trails"
+#   font         (name, bold)
+#   font_size    fixed glyph size in pixels, or
+#   columns      number of columns; the glyph size is width // columns
+#   cell         grid pitch in pixels for the grid scenes
+#   charset      glyphs to draw; repeats weight random choice
+#   camera       cv2.VideoCapture index or device path, or a list of them
+#                to run several cameras at once
+#   camera_layout
+#                with several cameras, "tile" (default) to give each an
+#                equal band of columns left to right, or "merge" to
+#                analyse each over the whole grid and keep the brightest
+#   camera_size  (width, height) to ask the camera for, or None for its
+#                default mode; see camera.open_camera
+#   camera_fps   frame rate to ask the camera for (default camera.CAMERA_FPS)
+#   fullscreen   open a fullscreen window at the monitor's resolution
+#   analysis     EdgeAnalyzer keywords (canny, halo, halo_mode, gain,
+#                incremental, ...)
+#   fade         alpha (0–255) of the black layer dimming the last frame,
+#                0 to clear every frame
+#   dirty        push only changed column strips (streams scene)
+#   stall        seconds without a camera frame before giving up, or None
+#
+# Scene-specific keys are documented on the scene classes.
+
+PRESETS = {}
+
+
+def register(name, **config):
+    """Add or replace a preset; returns its config dict."""
+    PRESETS[name] = config
+    return config
+
+
+def get_preset(name):
+    """A copy of a preset's config, safe to modify."""
+    try:
+        config = PRESETS[name]
+    except KeyError:
+        raise ValueError(f"unknown preset {name!r}, expected one of {', '.join(PRESETS)}")
+    return dict(config)
+
+
+# ---- column rain: one drop per column, respawned as soon as it leaves ----
+register(
+    "attempt1", title="Matrix Rain with Edge Attraction", scene="streams",
+    font_size=16, charset=string.ascii_letters + string.digits, color=(0, 255, 70),
+    analysis=dict(canny=(100, 200), halo=None), fade=0,
+    rain=dict(speed=4, length=(1, 1), spawn_base=1.0, spawn_edge=0.0,
+              spawn_above=True, mutate=1.0),
+)
+register(
+    "attempt2", title="Matrix Rain Stable Version", scene="streams",
+    font_size=16, charset=string.ascii_letters + string.digits,
+    analysis=dict(canny=(100, 200), halo=None), fade=40, stall=3.0,
+    rain=dict(speed=1.2, length=(8, 25), spawn_base=1.0, spawn_edge=0.0,
+              spawn_above=True, head_white=(0.08, 180), mutate=1.0, fade_min=0),
+)
+# myTest2 left "brighten near the lines" as a TODO; here the halo does it
+register(
+    "myTest2", title="Matrix", scene="streams",
+    font=("couriernew", False), font_size=14, col_width=10, row_pitch=20,
+    charset="0123456789:・.=*+-<>",
+    analysis=dict(canny=(40, 120), halo=6), fade=0,
+    rain=dict(speed=(0.05, 0.25), length=(30, 30), spawn_base=1.0, spawn_edge=0.0,
+              bright_base=155, bright_gain=100 / 255, fade="linear", fade_min=100,
+              mutate=0.05),
+)
+
+# ---- stream rain: edge-weighted spawning of falling streams ----
+register(
+    "attempt3", title="Edge-Density Matrix Rain", scene="streams",
+    font_size=16, charset=MATRIX,
+    analysis=dict(canny=(100, 200), halo=None), fade=45, stall=3.0,
+    capacity=64,
+    rain=dict(speed=0.3, length=(8, 25), per_column=None, spawn_base=0.005,
+              spawn_edge=0.25, spawn_above=True, fade="linear", fade_min=30,
+              head_white=(0.08, 150), mutate=3 / 51),
+)
+register(
+    "attempt4", title="Clean Matrix Silhouette", scene="streams",
+    columns=60, charset=string.digits,
+    analysis=dict(canny=(70, 150), halo=None), fade=60, dirty=True,
+    rain=dict(speed=1.0, length=(12, 12), spawn_base=0.002, spawn_edge=0.15,
+              bright_base=150, bright_gain=(255 - 150) / 255, fade_min=30),
+)
+register(
+    "attempt5", title="Matrix Silhouette - Halo Edge Version", scene="streams",
+    columns=60, charset=string.digits,
+    analysis=dict(canny=(50, 120), halo=35, halo_mode="pyramid"), fade=50, dirty=True,
+    rain=dict(speed=1.3, length=(15, 15), spawn_base=0.003, spawn_edge=0.2,
+              bright_base=50, bright_gain=2.5, fade_min=25),
+)
+register(
+    "attempt7", title="Matrix Silhouette - Thin Sharp Version", scene="streams",
+    columns=90, charset=string.digits,
+    analysis=dict(canny=(60, 130), halo=6), fade=50, dirty=True,
+    rain=dict(speed=1.1, length=(12, 12), spawn_base=0.0015, spawn_edge=0.25,
+              bright_base=0, bright_gain=2.2, bright_min=50, fade_min=30),
+)
+
+# ---- full-grid silhouette: every cell drawn, lit by the edge halo ----
+register(
+    "attempt6", title="Matrix Silhouette - Full Grid Method", scene="grid",
+    cell=8, charset=MATRIX,
+    analysis=dict(canny=(40, 120), halo=6, gain=3.0), fade=55,
+    speed=0.06, lut=(60, 255),
+)
+register(
+    "myTest", title="Matrix Silhouette - Full Grid Method", scene="grid",
+    cell=10, charset="0000000000000000000111111111111111111111123456789Z:・.=*+-<>",
+    camera=1, fullscreen=True,
+    analysis=dict(canny=(40, 120), halo=6, gain=3.0), fade=55,
+    speed=0.06, lut=(60, 255),
+)
+
+# ---- trail grid: static glyph grid lit by a falling trail per column ----
+register(
+    "attempt8", title="Matrix Silhouette - Full Grid Method", scene="trails",
+    cell=8, charset=MATRIX,
+    analysis=dict(canny=(40, 120), halo=6, gain=3.0), fade=55,
+    speed=0.18, length=(5, 30), relength=0.01, edge_floor=0.4, lut=(40, 255),
+)
@@ -0,0 +1,180 @@
+import time
+
+import cv2
+import numpy as np
+
+from .sources import _pace
+
+# A recording is one .npy file holding a ring of frame records:
+#
+#   seq    1, 2, 3, ... in capture order; 0 for a slot never written
+#   time   time.perf_counter() when the camera's read() returned
+#   image  the BGR frame exactly as read() returned it
+#
+# np.load(path, mmap_mode="r") opens it like any .npy. Once the ring has
+# wrapped, the lowest seq is the oldest frame kept.
+
+
+def record_dtype(shape):
+    """The record dtype for frames of `shape` (height, width, channels)."""
+    return np.dtype([("seq", "<i8"), ("time", "<f8"), ("image", "u1", tuple(shape))])
+
+
+class RecordingCapture:
+    """Wraps a cv2.VideoCapture-like source and records what it delivers.
+
+    Every frame read() returns is also copied into a memory-mapped ring
+    of the last `capacity` frames at `path`, with its read() timestamp.
+    The file is created at the first frame, sized from it, so the
+    recording holds the camera's own frames, not a resized copy. The copy
+    runs in read() on the capture thread, which adds one memcpy of a
+    frame to every read; the OS writes the pages out in the background.
+
+    source:   camera (or any capture) to pass through
+    path:     .npy file to create
+    capacity: frames kept; older ones are overwritten
+    """
+
+    def __init__(self, source, path, capacity=600):
+        self.source = source
+        self.path = path
+        self.capacity = capacity
+        self.frames = 0                   # frames recorded, including overwritten ones
+        self._ring = None
+
+    def isOpened(self):
+        return self.source.isOpened()
+
+    def set(self, prop, value):
+        return self.source.set(prop, value)
+
+    def get(self, prop):
+        return self.source.get(prop)
+
+    def read(self):
+        ok, image = self.source.read()
+        now = time.perf_counter()
+        if not ok:
+            return ok, image
+        if self._ring is None:
+            self._ring = np.lib.format.open_memmap(self.path, mode="w+", shape=(self.capacity,),
+                                                   dtype=record_dtype(image.shape))
+        elif image.shape != self._ring.dtype["image"].shape:
+            raise ValueError(f"frame size changed from {self._ring.dtype['image'].shape} "
+                             f"to {image.shape} while recording {self.path}")
+        slot = self.frames % self.capacity
+        self._ring["image"][slot] = image
+        self._ring["time"][slot] = now
+        # seq last: a slot reads as filled only once its frame is in
+        self.frames += 1
+        self._ring["seq"][slot] = self.frames
+        return ok, image
+
+    def release(self):
+        if self._ring is not None:
+            self._ring.flush()
+            self._ring = None
+        self.source.release()
+
+
+class MemmapCapture:
+    """Plays a RecordingCapture file back as a camera, without decoding.
+
+    read() hands out read-only np.memmap views straight into the file,
+    so a frame costs no decode and no copy: what the pipeline spends is
+    its own time, and the first pass over a file not yet in the page
+    cache reads it from disk.
+
+    path: recording to play
+    fps:  "recorded" to deliver each frame when it came in the original
+          run, a number to pace at that rate, or None for as fast as
+          read() is called
+    loop: start over at the end like an endless camera; False makes
+          read() fail after the last frame, for OfflineRender
+
+    CAP_PROP_FRAME_COUNT and CAP_PROP_FPS report the recording's;
+    CAP_PROP_POS_FRAMES can be read and set. The frame size can't be
+    changed, as with a camera that only has the one mode.
+    """
+
+    def __init__(self, path, fps="recorded", loop=True):
+        self.path = path
+        self.fps = fps
+        self.loop = loop
+        ring = np.load(path, mmap_mode="r")
+        filled = np.flatnonzero(ring["seq"])
+        if len(filled) == 0:
+            raise IOError(f"{path} holds no frames")
+        self._order = filled[np.argsort(ring["seq"][filled])]
+        self._images = ring["image"]
+        self.times = ring["time"][self._order]
+        self.frames = len(self._order)
+        self.height, self.width = ring.dtype["image"].shape[:2]
+        span = self.times[-1] - self.times[0]
+        self.recorded_fps = (self.frames - 1) / span if span > 0 else 0.0
+        self.position = 0
+        self._start = None                # perf_counter() the playback clock started
+        self._next = None
+        self._open = True
+
+    def isOpened(self):
+        return self._open
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.position = int(value) % self.frames if self.loop else int(value)
+            self._start = None
+            return True
+        if prop == cv2.CAP_PROP_FPS:
+            self.fps = value or None
+            return True
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.recorded_fps)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.frames)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.position)
+        return 0.0
+
+    def release(self):
+        self._open = False
+        self._images = None
+
+    def read(self):
+        if not self._open:
+            return False, None
+        if self.position >= self.frames:
+            if not self.loop:
+                return False, None
+            self.position = 0
+            self._start = None
+
+        if self.fps == "recorded":
+            # hold each frame until its offset into the recording has passed
+            now = time.perf_counter()
+            offset = self.times[self.position] - self.times[0]
+            if self._start is None or now - (self._start + offset) > 1.0:
+                self._start = now - offset
+            elif self._start + offset > now:
+                time.sleep(self._start + offset - now)
+        else:
+            _pace(self)
+
+        # one record's image field: a view into the file
+        image = self._images[self._order[self.position]]
+        self.position += 1
+        return True, image
+
+
+def open_file(path):
+    """A capture of a recording (.npy, read as fast as asked, no loop) or a video file."""
+    if path.endswith(".npy"):
+        return MemmapCapture(path, fps=None, loop=False)
+    return cv2.VideoCapture(path)
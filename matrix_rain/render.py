@@ -0,0 +1,277 @@
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+
+import cv2
+import numpy as np
+import pygame
+
+from .analysis import EdgeAnalyzer
+from .engine import build_scene
+from .presets import get_preset
+from .recording import open_file
+from .sampling import spans
+from .scenes import REFERENCE_FPS
+from .timing import FrameTimer
+
+
+class OfflineRender:
+    """Recorded footage in, a rendered video or numbered PNGs out, uncapped.
+
+    Every source frame is analysed and drawn in turn, with no window,
+    camera thread or clock.tick, onto an offscreen surface backed by the
+    BGR array the writer takes. Scene time is the video's: each frame
+    moves the animation on by 1/fps seconds however long it took to
+    render, so with the same `seed` the same footage renders the same.
+
+    preset:   name in PRESETS
+    source:   video file or recording (.npy) path, or any
+              cv2.VideoCapture-like source; the render ends when read()
+              fails
+    output:   video file for cv2.VideoWriter, a path with a printf field
+              such as "frames/%05d.png" for one image per frame, or None
+              to render without writing
+    size:     (width, height) of the render; default the source's frame size
+    fps:      frame rate of the output and of scene time; default the
+              source's, else REFERENCE_FPS
+    seed:     seed for the scene's random streams
+    codec:    fourcc for cv2.VideoWriter
+    first:    number of the first image written to a printf output
+    analysis_cell:
+              EdgeAnalyzer analysis_cell (None = full resolution)
+    **overrides:
+              replace any preset key for this render
+
+    `frame` is the BGR array of the last rendered frame and `timer` a
+    FrameTimer with decode, the analyzer's stages, simulate, render and
+    encode.
+    """
+
+    def __init__(self, preset, source, output, size=None, fps=None, seed=0, codec="mp4v",
+                 first=0, analysis_cell=4, **overrides):
+        self.name = preset
+        self.config = get_preset(preset)
+        self.config.update(overrides)
+        self.source = source
+        self.output = output
+        self.size = size
+        self.fps = fps
+        self.seed = seed
+        self.codec = codec
+        self.first = first
+        self.analysis_cell = analysis_cell
+
+        self.capture = None
+        self.writer = None
+        self.frame = None
+        self.screen = None
+        self.analyzer = None
+        self.scene = None
+        self.timer = None
+        self.frames = 0
+
+    def open(self):
+        config = self.config
+        if isinstance(self.source, str):
+            self.capture = open_file(self.source)
+            if not self.capture.isOpened():
+                raise IOError(f"cannot open {self.source}")
+        else:
+            self.capture = self.source
+        if self.size is None:
+            self.size = (int(self.capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                         int(self.capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+        self.fps = self.fps or self.capture.get(cv2.CAP_PROP_FPS) or REFERENCE_FPS
+        width, height = self.size
+
+        # the atlas needs fonts, not a display
+        pygame.font.init()
+        self.frame = np.zeros((height, width, 3), np.uint8)
+        self.screen = pygame.image.frombuffer(self.frame, self.size, "BGR")
+        self.scene = build_scene(config, self.size, self.fps, seed=self.seed)
+        self.analyzer = EdgeAnalyzer(self.size, self.scene.grid, self.scene.cell,
+                                     analysis_cell=self.analysis_cell, **config["analysis"])
+
+        if self.output is not None and "%" not in self.output:
+            fourcc = cv2.VideoWriter_fourcc(*self.codec)
+            self.writer = cv2.VideoWriter(self.output, fourcc, self.fps, self.size)
+            if not self.writer.isOpened():
+                raise IOError(f"cannot write {self.output} with codec {self.codec!r}")
+        elif self.output is not None:
+            folder = os.path.dirname(self.output)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+        self.timer = FrameTimer()
+        self.analyzer.timer = self.timer
+        return self
+
+    def step(self, write=True):
+        """Render the next source frame; False once the source runs out.
+
+        With write=False the frame is rendered but not written or
+        counted, to bring the scene up to speed before the part wanted.
+        """
+        timer = self.timer
+        ok, image = self.capture.read()
+        if not ok:
+            return False
+        timer.lap("decode")
+
+        field = self.analyzer(image)
+        self.scene.update(field, REFERENCE_FPS / self.fps)
+        timer.lap("simulate")
+        self.scene.draw(self.screen)
+        timer.lap("render")
+
+        if not write:
+            timer.end_frame()
+            return True
+        if self.writer is not None:
+            self.writer.write(self.frame)
+        elif self.output is not None:
+            cv2.imwrite(self.output % (self.first + self.frames), self.frame)
+        timer.lap("encode")
+        timer.end_frame()
+        self.frames += 1
+        return True
+
+    def run(self, frames=None):
+        """Open if needed and render until the source ends (or `frames` frames); always closes."""
+        if self.scene is None:
+            self.open()
+        try:
+            while frames is None or self.frames < frames:
+                if not self.step():
+                    break
+        finally:
+            self.close()
+        return self
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.release()
+            self.writer = None
+        if self.capture is not None:
+            self.capture.release()
+            self.capture = None
+        if self.timer is not None:
+            self.timer.close()
+
+    def __enter__(self):
+        return self.open()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _render_segment(preset, path, output, start, count, warmup, size, fps, seed,
+                    codec, first, analysis_cell, overrides):
+    # one process's share of render_parallel: seek, warm up, render `count` frames
+    capture = open_file(path)
+    if not capture.isOpened():
+        raise IOError(f"cannot open {path}")
+    warmup = min(warmup, start)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, start - warmup)
+    job = OfflineRender(preset, capture, output, size, fps=fps, seed=seed, codec=codec,
+                        first=first, analysis_cell=analysis_cell, **overrides).open()
+    try:
+        for _ in range(warmup):
+            if not job.step(write=False):
+                break
+        while count is None or job.frames < count:
+            if not job.step():
+                break
+    finally:
+        job.close()
+    return job.frames
+
+
+def _concat(parts, output, fps, size, codec, ffmpeg):
+    if ffmpeg:
+        listing = os.path.join(os.path.dirname(parts[0]), "parts.txt")
+        with open(listing, "w") as f:
+            f.writelines(f"file '{os.path.abspath(part)}'\n" for part in parts)
+        subprocess.run([ffmpeg, "-y", "-loglevel", "error", "-f", "concat", "-safe", "0",
+                        "-i", listing, "-c", "copy", output], check=True)
+        return
+    writer = cv2.VideoWriter(output, cv2.VideoWriter_fourcc(*codec), fps, size)
+    if not writer.isOpened():
+        raise IOError(f"cannot write {output} with codec {codec!r}")
+    try:
+        for part in parts:
+            capture = cv2.VideoCapture(part)
+            ok, frame = capture.read()
+            while ok:
+                writer.write(frame)
+                ok, frame = capture.read()
+            capture.release()
+    finally:
+        writer.release()
+
+
+def render_parallel(preset, path, output, workers=None, warmup=3.0, size=None, fps=None,
+                    seed=0, codec="mp4v", analysis_cell=4, **overrides):
+    """OfflineRender of a video file or recording split into frame ranges, one process each.
+
+    Each range is rendered from `warmup` seconds before its first frame
+    without writing, so it starts with the rain, trails and fades of a
+    scene already running instead of a black screen. The drops
+    themselves don't line up across a boundary: range k seeds its scene
+    with child k of SeedSequence(seed), so a render is reproducible for
+    the same seed and worker count.
+
+    A printf `output` gets its images straight from the workers. A video
+    is written as segments in a temporary folder next to it and joined in
+    order: with the ffmpeg executable on PATH the segments are encoded
+    with `codec` and joined by stream copy, otherwise they are lossless
+    FFV1 and encoded once with `codec` while joining.
+
+    Workers are started with the "spawn" method, so call this from an
+    entry point guarded by `if __name__ == "__main__":`. Other arguments
+    are OfflineRender's. Returns the number of frames written.
+    """
+    capture = open_file(path)
+    if not capture.isOpened():
+        raise IOError(f"cannot open {path}")
+    total = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+    fps = fps or capture.get(cv2.CAP_PROP_FPS) or REFERENCE_FPS
+    if size is None:
+        size = (int(capture.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+    capture.release()
+    if total < 1:
+        raise ValueError(f"{path} does not report its frame count; render it with OfflineRender")
+
+    workers = max(1, min(workers or os.cpu_count() or 1, total))
+    bounds = spans(total, workers).tolist()
+    seeds = np.random.SeedSequence(seed).spawn(workers)
+    # the container's frame count can be off; the last range runs to the end
+    counts = [b - a for a, b in zip(bounds[:-1], bounds[1:-1])] + [None]
+
+    ffmpeg = shutil.which("ffmpeg")
+    folder = None
+    if "%" in output:
+        outputs = [output] * workers
+        firsts = bounds[:-1]
+        part_codec = codec
+    else:
+        folder = tempfile.mkdtemp(prefix=".segments-",
+                                  dir=os.path.dirname(os.path.abspath(output)))
+        ext, part_codec = (os.path.splitext(output)[1], codec) if ffmpeg else (".mkv", "FFV1")
+        outputs = [os.path.join(folder, f"{k:04d}{ext}") for k in range(workers)]
+        firsts = [0] * workers
+
+    jobs = [(preset, path, outputs[k], bounds[k], counts[k], round(warmup * fps), size, fps,
+             seeds[k], part_codec, firsts[k], analysis_cell, overrides)
+            for k in range(workers)]
+    try:
+        with multiprocessing.get_context("spawn").Pool(workers) as pool:
+            written = pool.starmap(_render_segment, jobs)
+        if folder is not None:
+            _concat(outputs, output, fps, size, codec, ffmpeg)
+    finally:
+        if folder is not None:
+            shutil.rmtree(folder, ignore_errors=True)
+    return sum(written)
@@ -0,0 +1,52 @@
+import cv2
+import numpy as np
+
+from . import kernels
+
+
+def spans(length, count, size=None):
+    """Bounds of `count` consecutive spans over `length` pixels.
+
+    With a fixed `size` the spans sit at multiples of it, as the renderers
+    draw them, and pixels past the last one are ignored (the last span is
+    clipped if it runs off the edge). Without one the length is split
+    evenly and the remainder pixels are spread across the spans.
+    """
+    if count < 1 or count > length:
+        raise ValueError(f"cannot split {length} pixels into {count} spans")
+    if size is None:
+        return np.arange(count + 1) * length // count
+    if (count - 1) * size >= length:
+        raise ValueError(f"{count} spans of {size}px do not fit in {length} pixels")
+    return np.minimum(np.arange(count + 1) * size, length)
+
+
+def cell_grid(img, rows, cols, cell_w=None, cell_h=None, out=None):
+    """Mean of `img` inside every cell of a rows x cols grid (float32)."""
+    ys = spans(img.shape[0], rows, cell_h)
+    xs = spans(img.shape[1], cols, cell_w)
+    if out is None:
+        out = np.empty((rows, cols), dtype=np.float32)
+
+    h = ys[1] - ys[0]
+    w = xs[1] - xs[0]
+    uniform = ys[-1] == rows * h and xs[-1] == cols * w
+    if uniform and img.dtype == np.float32:
+        # integer box shrink: INTER_AREA is an exact per-cell mean
+        cv2.resize(img[:ys[-1], :xs[-1]], (cols, rows), dst=out,
+                   interpolation=cv2.INTER_AREA)
+        return out
+
+    return kernels.cell_means(img, ys, xs, out)
+
+
+def column_profile(img, cols, col_w=None, out=None):
+    """Mean of `img` over the full height of each of `cols` columns (float32)."""
+    xs = spans(img.shape[1], cols, col_w)
+    if out is None:
+        out = np.empty(cols, dtype=np.float32)
+
+    means = cv2.reduce(img, 0, cv2.REDUCE_AVG, dtype=cv2.CV_32F)[0]
+    sums = np.add.reduceat(means[:xs[-1]], xs[:-1])
+    np.divide(sums, np.diff(xs), out=out)
+    return out
@@ -0,0 +1,224 @@
+import numpy as np
+import pygame
+
+from . import kernels
+from .compositor import GridCompositor, green_lut
+from .dirty import DirtyStrips
+from .streams import StreamRain, chance
+
+# Scenes turn the analyzer's 0–1 edge field into pixels. Each one says
+# what grid it wants analysed (`grid`, `cell` for EdgeAnalyzer), advances
+# its animation in update(field, steps) and paints in draw(screen),
+# returning the rects to push or None for a full flip. Register new ones
+# in SCENES.
+#
+# Preset speeds, chances and fades are per frame at REFERENCE_FPS. A
+# scene drawn at another `rate` rescales its fades once, and update()
+# gets steps = elapsed seconds * REFERENCE_FPS.
+#
+# retune(config) takes new values for the keys that can change while
+# the scene runs (trail lengths, mutation); anything else needs a new
+# scene.
+REFERENCE_FPS = 30
+
+
+def _fade_fraction(fraction, rate):
+    # the same dimming per second at `rate` frames per second
+    return 1.0 - (1.0 - fraction) ** (REFERENCE_FPS / rate)
+
+
+def _fade_layer(size, alpha, rate):
+    if not alpha:
+        return None
+    layer = pygame.Surface(size, pygame.SRCALPHA)
+    layer.fill((0, 0, 0, max(1, round(255 * _fade_fraction(alpha / 255, rate)))))
+    return layer
+
+
+class StreamScene:
+    """Column and stream rain: StreamRain drawn glyph by glyph from the atlas.
+
+    col_width:  column pitch in pixels (default: the glyph size)
+    row_pitch:  vertical spacing of trail cells (default: the glyph size)
+    capacity:   streams per column to preallocate, or None
+    color:      draw every glyph in this one colour instead of the ramps
+    rain:       StreamRain keywords
+    """
+
+    def __init__(self, config, size, atlas, rate=REFERENCE_FPS, seed=None):
+        width, height = size
+        glyph = atlas.size
+        self.atlas = atlas
+        self.col_width = config.get("col_width") or glyph
+        # a preset's column count stands, as in its script; the pitch
+        # (width // columns) leaves the remainder pixels at the right edge
+        self.columns = config.get("columns") or width // self.col_width
+        self.grid = (1, self.columns)
+        self.cell = (self.col_width, None)
+        self.color = config.get("color")
+
+        rain = dict(config["rain"])
+        if config.get("capacity"):
+            rain["capacity"] = self.columns * config["capacity"]
+        # glyphs weighted by repeats in the charset, as in the grid scenes
+        weighted = np.array([atlas.index[ch] for ch in config["charset"]])
+        self.rain = StreamRain(self.columns, self.col_width, config.get("row_pitch") or glyph,
+                               height, weighted, seed=seed, **rain)
+
+        self.fade = _fade_layer(size, config.get("fade"), rate)
+        self.dirty = None
+        if config.get("dirty"):
+            self.dirty = DirtyStrips(self.columns, self.col_width, height, self.fade)
+        self._trail = None
+
+    def retune(self, config):
+        rain = config["rain"]
+        # lengths past the glyph arrays allocated at startup can't be drawn
+        lo, hi = rain["length"]
+        top = self.rain.glyphs.shape[1]
+        self.rain.length_range = (min(lo, top), min(hi, top))
+        self.rain.mutate = rain.get("mutate", 0.0)
+
+    def update(self, field, steps=1.0):
+        self.rain.update(field[0], steps)
+        self._trail = self.rain.trail()
+
+    def draw(self, screen):
+        xs, ys, glyphs, levels, heads = self._trail
+        rects = None
+        if self.dirty is not None:
+            self.dirty.mark(xs // self.col_width)
+            rects = self.dirty.rects()
+            if self.fade is not None:
+                self.dirty.fade(screen, self.fade, rects)
+            else:
+                # no fade: a strip stays dirty the frame after its last glyph,
+                # so clearing the dirty strips clears everything drawn
+                for r in rects:
+                    screen.fill((0, 0, 0), r)
+        elif self.fade is not None:
+            screen.blit(self.fade, (0, 0))
+        else:
+            screen.fill((0, 0, 0))
+
+        atlas = self.atlas
+        chars = atlas.chars
+        blit = screen.blit
+        if self.color is not None:
+            for x, y, g in zip(xs.tolist(), ys.tolist(), glyphs.tolist()):
+                blit(atlas.colored(chars[g], self.color), (x, y))
+        elif self.rain.head_white is not None:
+            for x, y, g, level, head in zip(xs.tolist(), ys.tolist(), glyphs.tolist(),
+                                            levels.tolist(), heads.tolist()):
+                blit(atlas.white(chars[g], head) if head else atlas.green(chars[g], level), (x, y))
+        else:
+            for x, y, g, level in zip(xs.tolist(), ys.tolist(), glyphs.tolist(), levels.tolist()):
+                blit(atlas.green(chars[g], level), (x, y))
+        return rects
+
+
+class GridScene:
+    """Full-grid silhouette: a glyph in every cell, scrolling per column,
+    its green level set by the edge halo. Drawn with GridCompositor.
+
+    speed:  scroll speed in rows per frame
+    lut:    (lo, hi) green of the dimmest and brightest level
+    """
+
+    def __init__(self, config, size, atlas, rate=REFERENCE_FPS, seed=None):
+        width, height = size
+        cell = config["cell"]
+        self.rows, self.cols = rows, cols = height // cell, width // cell
+        self.grid = (rows, cols)
+        self.cell = (cell, cell)
+        self.speed = config["speed"]
+        self.rng = np.random.default_rng(seed)
+
+        # random glyphs for the whole grid, weighted by repeats in the charset
+        weighted = np.array([atlas.index[ch] for ch in config["charset"]])
+        self.chars = self.rng.choice(weighted, (rows, cols))
+        self.offsets = self.rng.uniform(0, rows, cols)
+        self._rows = np.arange(rows)[:, None]
+        self._cols = np.arange(cols)
+
+        self.compositor = GridCompositor(atlas, rows, cols, self.cell,
+                                         green_lut(*config["lut"]),
+                                         fade=_fade_fraction(config.get("fade", 0) / 255, rate))
+        self._glyphs = None
+        self._levels = None
+
+    def retune(self, config):
+        pass
+
+    def update(self, field, steps=1.0):
+        self.offsets = (self.offsets + self.speed * steps) % self.rows
+        rr = (self._rows + self.offsets).astype(int) % self.rows
+        self._glyphs = self.chars[rr, self._cols]
+        self._levels = self.compositor.quantize(field)
+
+    def draw(self, screen):
+        self.compositor.present(screen, self._glyphs, self._levels)
+        return None
+
+
+class TrailScene:
+    """Trail grid: a fixed glyph grid where each column lights a falling
+    trail, brightest at its head and boosted by the edge halo. Cells off
+    the trails keep fading. Drawn with GridCompositor.
+
+    speed:      head speed in rows per frame
+    length:     (lo, hi) trail length in cells
+    relength:   chance per column and frame of a new trail length
+    edge_floor: brightness factor of a trail cell with no edges nearby
+    lut:        (lo, hi) green of the dimmest and brightest lit level
+    """
+
+    def __init__(self, config, size, atlas, rate=REFERENCE_FPS, seed=None):
+        width, height = size
+        cell = config["cell"]
+        self.rows, self.cols = rows, cols = height // cell, width // cell
+        self.grid = (rows, cols)
+        self.cell = (cell, cell)
+        self.speed = config["speed"]
+        self.length_range = config["length"]
+        self.relength = config["relength"]
+        self.edge_floor = config["edge_floor"]
+        self.rng = np.random.default_rng(seed)
+
+        weighted = np.array([atlas.index[ch] for ch in config["charset"]])
+        self.chars = self.rng.choice(weighted, (rows, cols))
+        self.heads = self.rng.uniform(0, rows, cols)
+        lo, hi = self.length_range
+        self.lengths = self.rng.integers(lo, hi + 1, cols)
+
+        # level 0 is black: lightening with it leaves a fading cell alone
+        lut = green_lut(*config["lut"])
+        lut = np.vstack((np.zeros((1, 3), np.uint8), lut[1:]))
+        self.compositor = GridCompositor(atlas, rows, cols, self.cell, lut,
+                                         fade=_fade_fraction(config.get("fade", 0) / 255, rate))
+        self._levels = np.zeros((rows, cols), dtype=np.intp)
+        self._bright = np.empty((rows, cols), dtype=np.float32)
+
+    def retune(self, config):
+        self.length_range = config["length"]
+        lo, hi = self.length_range
+        np.clip(self.lengths, lo, hi, out=self.lengths)
+
+    def update(self, field, steps=1.0):
+        self.heads = (self.heads + self.speed * steps) % self.rows
+        renew = self.rng.random(self.cols) < chance(self.relength, steps)
+        lo, hi = self.length_range
+        self.lengths[renew] = self.rng.integers(lo, hi + 1, np.count_nonzero(renew))
+        kernels.trail_levels(field, self.heads, self.lengths, self.edge_floor,
+                             self.compositor.levels - 1, self._levels, self._bright)
+
+    def draw(self, screen):
+        self.compositor.present(screen, self.chars, self._levels)
+        return None
+
+
+SCENES = {
+    "streams": StreamScene,
+    "grid": GridScene,
+    "trails": TrailScene,
+}
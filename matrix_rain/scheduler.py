@@ -0,0 +1,252 @@
+import math
+import threading
+import time
+
+import numpy as np
+
+from .timing import FrameTimer
+
+BLENDS = (None, "exp", "linear")
+LAYOUTS = ("tile", "merge")
+
+
+class AnalysisClock:
+    """Edge analysis on its own clock, blended into a grid for every render frame.
+
+    The render loop calls sample() once per displayed frame and never waits
+    for analysis. With `threaded`, the analyzer runs on its own thread
+    (OpenCV and NumPy release the GIL for the heavy work) whenever the
+    camera has a new frame and at most `rate` times a second. Without it,
+    sample() runs a due analysis inline, which is simpler but stalls that
+    one frame.
+
+    analyzer: EdgeAnalyzer or any callable(frame, out=grid)
+    reader:   LatestFrameReader to take frames from
+    rate:     analyses per second at most, or None for every new frame
+    blend:    None shows the newest result as is. "exp" eases toward it
+              with time constant `tau` seconds. "linear" slides from the
+              previous result to the newest over one analysis interval,
+              so it runs one interval behind but never overshoots.
+
+    In threaded mode analysis stages are timed on `timer`, a FrameTimer
+    of its own, since the render loop's laps can't be shared across
+    threads.
+
+    `seq` and `captured` are the Frame.seq and Frame.timestamp of the
+    camera frame behind the newest result sample() has blended in. `name`
+    names the analysis thread.
+    """
+
+    def __init__(self, analyzer, reader, rate=None, blend="exp", tau=0.05, threaded=True,
+                 name="analysis"):
+        if blend not in BLENDS:
+            raise ValueError(f"blend must be one of {BLENDS}, not {blend!r}")
+        self.analyzer = analyzer
+        self.reader = reader
+        self.rate = rate
+        self.blend = blend
+        self.tau = tau
+        self.threaded = threaded
+        self.name = name
+        self.results = 0                  # analyses completed
+        self.timer = FrameTimer() if threaded else None
+        self.seq = None
+        self.captured = None
+
+        shape = analyzer.grid
+        self._grids = [np.zeros(shape, np.float32), np.zeros(shape, np.float32)]
+        self._front = 0                   # index into _grids of the newest result
+        self._published = 0.0             # perf_counter() when it was published
+        self._seq = 0                     # camera frame it was computed from
+        self._captured = None             # and when that frame was read
+        self._due = 0.0
+
+        self._target = np.zeros(shape, np.float32)
+        self._previous = np.zeros(shape, np.float32)
+        self._display = np.zeros(shape, np.float32)
+        self._scratch = np.zeros(shape, np.float32)
+        self._target_time = self._previous_time = 0.0
+        self._seen = 0
+        self._last_sample = None
+
+        self._lock = threading.Lock()
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self.threaded:
+            self.analyzer.timer = self.timer
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _analyse(self, frame):
+        back = 1 - self._front
+        timer = getattr(self.analyzer, "timer", None)
+        if timer is not None:
+            timer.frame = frame.seq
+        self.analyzer(frame.image, out=self._grids[back])
+        with self._lock:
+            self._front = back
+            self._published = time.perf_counter()
+            self._seq = frame.seq
+            self._captured = frame.timestamp
+            self.results += 1
+        if self.rate:
+            self._due = max(self._due + 1.0 / self.rate, self._published)
+
+    def _run(self):
+        while self._running:
+            frame = self.reader.wait(after_seq=self._seq, timeout=0.1)
+            if frame is None or frame.seq <= self._seq:
+                continue
+            wait = self._due - time.perf_counter()
+            if wait > 0:
+                time.sleep(wait)
+                frame = self.reader.latest()
+            self.timer.frame = frame.seq
+            self.timer.lap("idle")
+            self._analyse(frame)
+            self.timer.end_frame()
+
+    def _poll(self, now):
+        # inline mode: analyse here when a new frame is in and one is due
+        frame = self.reader.latest()
+        if frame is not None and frame.seq > self._seq and now >= self._due:
+            self._analyse(frame)
+
+    def sample(self, now=None):
+        """The grid to draw this frame, or None before the first analysis.
+
+        Returns an internal buffer that the next call overwrites.
+        """
+        if now is None:
+            now = time.perf_counter()
+        if not self.threaded:
+            self._poll(now)
+
+        with self._lock:
+            if self.results == 0:
+                return None
+            fresh = self.results != self._seen
+            if fresh:
+                self._seen = self.results
+                np.copyto(self._target, self._grids[self._front])
+                self._previous_time, self._target_time = self._target_time, self._published
+                self.seq, self.captured = self._seq, self._captured
+
+        first = self._last_sample is None
+        dt = 0.0 if first else now - self._last_sample
+        self._last_sample = now
+        display = self._display
+        if fresh:
+            # slide on from whatever is on screen now
+            np.copyto(self._previous, self._target if first else display)
+
+        if self.blend is None or first:
+            np.copyto(display, self._target)
+        elif self.blend == "exp":
+            k = 1.0 - math.exp(-dt / self.tau) if self.tau > 0 else 1.0
+            np.subtract(self._target, display, out=self._scratch)
+            self._scratch *= k
+            display += self._scratch
+        else:
+            interval = self._target_time - self._previous_time
+            k = min(1.0, max(0.0, now - self._target_time) / interval) if interval > 0 else 1.0
+            np.subtract(self._target, self._previous, out=self._scratch)
+            self._scratch *= k
+            np.add(self._previous, self._scratch, out=display)
+        return display
+
+
+class MultiClock:
+    """One AnalysisClock per camera, sampled as a single grid.
+
+    Every camera has its own capture thread and its own analysis thread,
+    so N cameras are analysed side by side on up to N cores and the
+    render loop pays for N grid copies per frame, not N analyses.
+
+    clocks:  AnalysisClocks in camera order
+    grid:    (rows, cols) of the combined grid
+    columns: column bounds, len(clocks) + 1 of them, to tile the cameras
+             left to right with each clock's grid filling its band; None
+             to merge full-size grids, keeping the brightest value of
+             every cell
+
+    A camera with no result yet reads as dark. sample() returns None
+    until at least one has one. `seq`, `captured` and `timer` are the
+    first camera's.
+    """
+
+    def __init__(self, clocks, grid, columns=None):
+        if columns is not None and len(columns) != len(clocks) + 1:
+            raise ValueError(f"{len(clocks)} cameras need {len(clocks) + 1} column bounds, "
+                             f"not {len(columns)}")
+        self.clocks = list(clocks)
+        self.grid = tuple(grid)
+        self.columns = columns
+        self.timer = self.clocks[0].timer
+        self._grid = np.zeros(self.grid, np.float32)
+
+    @property
+    def seq(self):
+        return self.clocks[0].seq
+
+    @property
+    def captured(self):
+        return self.clocks[0].captured
+
+    @property
+    def results(self):
+        return sum(clock.results for clock in self.clocks)
+
+    def start(self):
+        for clock in self.clocks:
+            clock.start()
+        return self
+
+    def stop(self):
+        for clock in self.clocks:
+            clock.stop()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def sample(self, now=None):
+        """The combined grid to draw this frame, or None before any analysis.
+
+        Every clock is sampled at the same `now`. Returns an internal
+        buffer that the next call overwrites.
+        """
+        if now is None:
+            now = time.perf_counter()
+        out = self._grid
+        merged = False
+        for k, clock in enumerate(self.clocks):
+            grid = clock.sample(now)
+            if grid is None:
+                continue
+            if self.columns is not None:
+                out[:, self.columns[k]:self.columns[k + 1]] = grid
+            elif merged:
+                np.maximum(out, grid, out=out)
+            else:
+                np.copyto(out, grid)
+            merged = True
+        return out if merged else None
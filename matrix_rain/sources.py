@@ -0,0 +1,140 @@
+import time
+
+import cv2
+import numpy as np
+
+
+def _pace(source):
+    # block until the source's next frame is due; resync after a long stall
+    if not source.fps:
+        return
+    now = time.perf_counter()
+    if source._next is None or now - source._next > 1.0:
+        source._next = now
+    elif source._next > now:
+        time.sleep(source._next - now)
+    source._next += 1.0 / source.fps
+
+
+class SyntheticCapture:
+    """Camera stand-in: a bright figure drifting over a noisy dark background.
+
+    Drop-in for cv2.VideoCapture (read / set / get / isOpened / release),
+    so the scripts and LatestFrameReader run unchanged on a machine with
+    no camera. Frames come at the size asked for with CAP_PROP_FRAME_WIDTH
+    and CAP_PROP_FRAME_HEIGHT. With `fps`, read() blocks until the next
+    frame is due like a real camera does; fps=None delivers as fast as
+    it is called.
+    """
+
+    def __init__(self, width=640, height=480, fps=30, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frames = 0
+        self._rng = np.random.default_rng(seed)
+        self._background = None
+        self._frame = None
+        self._next = None
+        self._open = True
+
+    def isOpened(self):
+        return self._open
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = value or None
+        else:
+            return False
+        self._background = None
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps or 0)
+        return 0.0
+
+    def release(self):
+        self._open = False
+
+    def read(self):
+        if not self._open:
+            return False, None
+        _pace(self)
+
+        w, h = self.width, self.height
+        if self._background is None:
+            self._background = self._rng.integers(0, 40, (h, w, 3), dtype=np.uint8)
+            self._frame = np.empty_like(self._background)
+        np.copyto(self._frame, self._background)
+
+        # head-and-shoulders blob on a slow Lissajous path
+        t = self.frames / 30.0
+        cx = int(w * (0.5 + 0.25 * np.sin(t * 0.7)))
+        cy = int(h * (0.55 + 0.1 * np.sin(t * 1.3)))
+        r = max(4, min(w, h) // 6)
+        cv2.circle(self._frame, (cx, cy - r), r, (200, 200, 200), -1)
+        cv2.ellipse(self._frame, (cx, cy + 2 * r), (2 * r, r + r // 2), 0, 180, 360,
+                    (170, 170, 170), -1)
+        self.frames += 1
+        # callers may keep the frame (LatestFrameReader does); hand out a copy
+        return True, self._frame.copy()
+
+
+class LoopingFileCapture:
+    """A recorded clip played as an endless camera, optionally paced to `fps`.
+
+    Frames are resized to CAP_PROP_FRAME_WIDTH × CAP_PROP_FRAME_HEIGHT
+    when those have been set, as a camera honouring the request would.
+    """
+
+    def __init__(self, path, fps=30):
+        self.path = path
+        self.fps = fps
+        self.size = None
+        self._cap = cv2.VideoCapture(path)
+        if not self._cap.isOpened():
+            raise IOError(f"cannot open {path}")
+        self._next = None
+
+    def isOpened(self):
+        return self._cap.isOpened()
+
+    def set(self, prop, value):
+        if prop in (cv2.CAP_PROP_FRAME_WIDTH, cv2.CAP_PROP_FRAME_HEIGHT):
+            w, h = self.size or (int(self._cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                                 int(self._cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+            self.size = (int(value), h) if prop == cv2.CAP_PROP_FRAME_WIDTH else (w, int(value))
+            return True
+        if prop == cv2.CAP_PROP_FPS:
+            self.fps = value or None
+            return True
+        return False
+
+    def get(self, prop):
+        if self.size is not None and prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.size[0])
+        if self.size is not None and prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.size[1])
+        return self._cap.get(prop)
+
+    def release(self):
+        self._cap.release()
+
+    def read(self):
+        _pace(self)
+        ok, image = self._cap.read()
+        if not ok:
+            self._cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, image = self._cap.read()
+        if ok and self.size is not None and image.shape[1::-1] != self.size:
+            image = cv2.resize(image, self.size)
+        return ok, image
@@ -0,0 +1,176 @@
+import numpy as np
+
+
+def chance(p, steps):
+    """Per-frame probability `p` rescaled to `steps` frames (may be fractional)."""
+    if steps == 1:
+        return p
+    return 1.0 - (1.0 - np.clip(p, 0.0, 1.0)) ** steps
+
+
+class StreamRain:
+    """Falling glyph streams held as preallocated struct-of-arrays.
+
+    Each slot of the fixed-capacity arrays is one stream: its column, head
+    y (pixels), trail length (cells), peak brightness and its own glyphs.
+    update() culls, spawns and moves every stream with whole-array ops, so
+    the per-frame cost does not depend on how many streams are alive.
+
+    columns:     number of rain columns
+    col_width:   horizontal pitch of the columns in pixels
+    cell:        vertical pitch of a trail (the font size)
+    height:      screen height; streams die once the tail leaves it
+    glyphs:      number of glyphs to pick from (indices into a charset),
+                 or an array of glyph indices where repeats weight the choice
+    speed:       fall speed in cells per frame, or (lo, hi) to draw one
+                 per stream
+    per_column:  max live streams per column, or None for no limit
+    spawn_base:  spawn probability per column and frame without edges
+    spawn_edge:  extra spawn probability per unit of edge force
+    spawn_above: start heads at a random height above the screen
+                 instead of one cell above it
+    bright_*:    peak brightness = clip(base + force * gain * 255, min, 255)
+    fade:        "step" dims by B // L per cell, "linear" by B * j / L
+    head_white:  (probability, tint) to draw heads white (255) or tinted,
+                 or None to shade heads like the rest of the trail
+    mutate:      probability per cell and frame of swapping its glyph
+
+    All randomness is drawn in bulk from `rng`, a numpy Generator seeded
+    with `seed`, so a seeded run replays exactly.
+    """
+
+    def __init__(self, columns, col_width, cell, height, glyphs, speed=1.0,
+                 length=(12, 12), capacity=None, per_column=1,
+                 spawn_base=0.002, spawn_edge=0.15, spawn_above=False,
+                 bright_base=255, bright_gain=0.0, bright_min=0,
+                 fade="step", fade_min=30, head_white=None, mutate=0.0, seed=None):
+        self.columns = columns
+        self.col_width = col_width
+        self.cell = cell
+        self.height = height
+        self.glyph_table = np.arange(glyphs) if np.isscalar(glyphs) else np.asarray(glyphs)
+        self.speed_range = (speed, speed) if np.isscalar(speed) else tuple(speed)
+        self.length_range = length
+        self.per_column = per_column
+        self.spawn_base = spawn_base
+        self.spawn_edge = spawn_edge
+        self.spawn_above = spawn_above
+        self.bright_base = bright_base
+        self.bright_gain = bright_gain
+        self.bright_min = bright_min
+        self.fade = fade
+        self.fade_min = fade_min
+        self.head_white = head_white
+        self.mutate = mutate
+        self.rng = np.random.default_rng(seed)
+
+        if capacity is None:
+            capacity = columns * (per_column or 32)
+        self.capacity = capacity
+        max_len = length[1]
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.col = np.zeros(capacity, dtype=np.int32)
+        self.y = np.zeros(capacity, dtype=np.float32)
+        self.speed = np.zeros(capacity, dtype=np.float32)          # pixels per frame
+        self.length = np.ones(capacity, dtype=np.int32)
+        self.brightness = np.zeros(capacity, dtype=np.int32)
+        self.glyphs = np.zeros((capacity, max_len), dtype=np.int32)
+        self._trail = np.arange(max_len, dtype=np.int32)
+
+    @property
+    def count(self):
+        return int(np.count_nonzero(self.alive))
+
+    def update(self, force, steps=1.0):
+        """Advance by `steps` frames; `force` is the 0–1 edge force per column.
+
+        Speeds and chances are per frame at the rate they were tuned for,
+        so steps = elapsed * that rate keeps the rain the same at any fps.
+        """
+        force = np.asarray(force, dtype=np.float32)
+
+        # Cull streams whose tail has left the screen
+        self.alive &= self.y <= self.height + self.length * self.cell
+
+        # Edge-weighted Bernoulli spawn, one draw per column
+        p = chance(self.spawn_base + force * self.spawn_edge, steps)
+        spawn = self.rng.random(self.columns) < p
+        if self.per_column is not None:
+            live = np.bincount(self.col[self.alive], minlength=self.columns)
+            spawn &= live < self.per_column
+        self._spawn(np.flatnonzero(spawn), force)
+
+        if self.mutate > 0:
+            p = chance(self.mutate, steps)
+            if p >= 1:
+                self.glyphs[...] = self._draw(self.glyphs.shape)
+            else:
+                # how many cells swap, then which: the same odds as a draw
+                # per cell, for the price of a draw per swap
+                cells = self.glyphs.size
+                n = self.rng.binomial(cells, p)
+                swap = self.rng.choice(cells, n, replace=False, shuffle=False)
+                self.glyphs.reshape(-1)[swap] = self._draw(n)
+
+        self.y[self.alive] += self.speed[self.alive] * steps
+
+    def _spawn(self, cols, force):
+        slots = np.flatnonzero(~self.alive)[:len(cols)]
+        cols = cols[:len(slots)]   # at capacity: extra spawns are dropped
+        n = len(slots)
+        if n == 0:
+            return
+
+        lo, hi = self.length_range
+        length = self.rng.integers(lo, hi + 1, n)
+        if self.spawn_above:
+            y = self.rng.uniform(-length * self.cell, 0)
+        else:
+            y = np.full(n, -self.cell)
+        bright = self.bright_base + force[cols] * self.bright_gain * 255
+
+        self.alive[slots] = True
+        self.col[slots] = cols
+        self.y[slots] = y
+        self.length[slots] = length
+        slow, fast = self.speed_range
+        self.speed[slots] = (self.rng.uniform(slow, fast, n) if fast > slow else slow) * self.cell
+        self.brightness[slots] = np.clip(bright, self.bright_min, 255)
+        # retune() can shorten the range below the arrays' width; trail() never
+        # reads past a stream's length
+        self.glyphs[slots, :hi] = self._draw((n, hi))
+
+    def _draw(self, size):
+        # random glyph indices, weighted by repeats in glyph_table
+        return self.glyph_table[self.rng.integers(0, len(self.glyph_table), size)]
+
+    def trail(self):
+        """Visible trail cells as flat arrays (x, y, glyph, level, head).
+
+        `level` is the green brightness of the cell; `head` is 0 for trail
+        cells and the white level for a head when head_white is set.
+        """
+        idx = np.flatnonzero(self.alive)
+        j = self._trail
+        length = self.length[idx, None]
+        bright = self.brightness[idx, None]
+
+        cy = (self.y[idx, None] - j * self.cell).astype(np.int32)
+        visible = (j < length) & (cy >= 0) & (cy < self.height)
+
+        if self.fade == "linear":
+            level = bright - (j * bright) // length
+        else:
+            level = bright - j * (bright // length)
+        level = np.maximum(level, self.fade_min)
+
+        head = np.zeros(visible.shape, dtype=np.int32)
+        if self.head_white is not None:
+            prob, tint = self.head_white
+            white = self.rng.random(len(idx)) < prob
+            head[:, 0] = np.where(white, 255, tint)
+
+        x = np.broadcast_to((self.col[idx] * self.col_width)[:, None], visible.shape)
+        return (x[visible], cy[visible], self.glyphs[idx][visible],
+                level[visible], head[visible])
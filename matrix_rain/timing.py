@@ -0,0 +1,138 @@
+import csv
+import time
+
+import numpy as np
+import pygame
+
+
+class FrameTimer:
+    """Per-stage frame timings with rolling percentiles, a HUD and CSV export.
+
+    Stages are timed as laps: lap("canny") charges everything since the
+    previous lap to "canny". end_frame() closes the frame, so the next
+    frame's first stage starts right there. Each lap is one perf_counter()
+    call and a dict update, cheap enough to leave on in production.
+
+    window:   frames kept per stage for the rolling p50/p95/p99
+    csv_path: if set, one row of per-stage milliseconds per frame, with a
+              column for every stage seen in the run (0 before it first ran)
+
+    With a trace.Tracer in `tracer`, every lap is also recorded as a span
+    tagged with `frame`, the camera frame being worked on.
+    """
+
+    def __init__(self, window=300, csv_path=None):
+        self.window = window
+        self.frames = 0
+        self.stages = []                  # in first-seen order
+        self._rings = {}
+        self._current = {}
+        self._t0 = self._t = time.perf_counter()
+
+        self._csv_file = None
+        self._csv = None
+        self._columns = None
+        self._header = 0                  # columns the file's header names
+        if csv_path is not None:
+            self._csv_file = open(csv_path, "w+", newline="")
+            self._csv = csv.writer(self._csv_file)
+
+        self._hud = None
+        self._hud_font = None
+        self.tracer = None
+        self.frame = None
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self._current[name] = self._current.get(name, 0.0) + (now - self._t)
+        if self.tracer is not None:
+            self.tracer.span(name, self.frame, self._t, now)
+        self._t = now
+        return now
+
+    def end_frame(self):
+        now = time.perf_counter()
+        current = self._current
+        current["total"] = now - self._t0
+        slot = self.frames % self.window
+
+        for name, seconds in current.items():
+            ring = self._rings.get(name)
+            if ring is None:
+                ring = self._rings[name] = np.full(self.window, np.nan)
+                self.stages.append(name)
+            ring[slot] = seconds * 1000.0
+        # stages skipped this frame count as 0 ms, not as a stale value
+        for name in self.stages:
+            if name not in current:
+                self._rings[name][slot] = 0.0
+
+        if self._csv is not None:
+            if self._columns is None:
+                self._columns = list(self.stages)
+                self._header = len(self._columns)
+                self._csv.writerow(["frame"] + [f"{name}_ms" for name in self._columns])
+            elif len(self._columns) < len(self.stages):
+                # a stage that started late; close() adds it to the header
+                self._columns = list(self.stages)
+            self._csv.writerow([self.frames] + [f"{current.get(name, 0.0) * 1000.0:.3f}"
+                                                for name in self._columns])
+
+        self.frames += 1
+        self._current = {}
+        self._t0 = self._t = now
+
+    def percentiles(self, name, q=(50, 95, 99)):
+        ring = self._rings[name]
+        return np.nanpercentile(ring, q) if self.frames else np.full(len(q), np.nan)
+
+    def summary(self):
+        """{stage: (p50, p95, p99)} in milliseconds over the rolling window."""
+        return {name: tuple(self.percentiles(name)) for name in self.stages}
+
+    def draw_hud(self, screen, pos=(8, 8), every=15):
+        """Overlay the summary table, rebuilt every `every` frames; returns its rect."""
+        if self._hud is None or self.frames % every == 0:
+            self._hud = self._render_hud()
+        if self._hud is None:
+            return pygame.Rect(pos, (0, 0))
+        return screen.blit(self._hud, pos)
+
+    def _render_hud(self):
+        if not self.stages:
+            return None
+        if self._hud_font is None:
+            self._hud_font = pygame.font.SysFont("Consolas", 14)
+        font = self._hud_font
+
+        lines = [f"{'stage':<10}{'p50':>7}{'p95':>7}{'p99':>7} ms"]
+        for name, (p50, p95, p99) in self.summary().items():
+            lines.append(f"{name:<10}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+        rendered = [font.render(line, True, (255, 255, 255)) for line in lines]
+
+        step = font.get_linesize()
+        width = max(r.get_width() for r in rendered) + 8
+        # opaque, so redrawing it over itself never smears old text
+        hud = pygame.Surface((width, step * len(rendered) + 8))
+        hud.fill((0, 0, 0))
+        for i, r in enumerate(rendered):
+            hud.blit(r, (4, 4 + i * step))
+        return hud
+
+    def _rewrite_csv(self):
+        """Rewrite the file with every column, earlier rows padded with 0 ms."""
+        self._csv_file.seek(0)
+        rows = list(csv.reader(self._csv_file))[1:]
+        self._csv_file.seek(0)
+        self._csv_file.truncate()
+        width = len(self._columns) + 1
+        self._csv.writerow(["frame"] + [f"{name}_ms" for name in self._columns])
+        self._csv.writerows(row + ["0.000"] * (width - len(row)) for row in rows)
+
+    def close(self):
+        if self._csv_file is not None:
+            if self._columns is not None and len(self._columns) > self._header:
+                self._rewrite_csv()
+            self._csv_file.close()
+            self._csv_file = None
+            self._csv = None
@@ -0,0 +1,113 @@
+import itertools
+import json
+import os
+import threading
+import time
+
+import numpy as np
+
+
+class Tracer:
+    """Per-frame spans from every pipeline thread, kept in a ring buffer.
+
+    A span is a named perf_counter() interval on the thread that recorded
+    it, tagged with the camera frame it worked on: Frame.seq, given out
+    by LatestFrameReader in capture order. The capture thread records its
+    reads, a FrameTimer with `tracer` set records every lap, and the
+    Engine calls shown() after each present with the camera frame behind
+    the grid on screen, once per camera when there are several.
+
+    Capture-to-photon latency is counted once per camera frame, at the
+    first present that shows it: from read() returning with the frame to
+    display.flip / update returning. Time the frame spent in the camera
+    and driver before read() is not visible from here.
+
+    export() writes Chrome trace event JSON, which chrome://tracing and
+    ui.perfetto.dev both open: one track per thread, the frame in each
+    span's args, and a latency counter track.
+
+    capacity:  spans kept; older ones are overwritten
+    latencies: shown frames kept for summary() and the counter track
+    """
+
+    def __init__(self, capacity=65536, latencies=4096):
+        self.capacity = capacity
+        self.t0 = time.perf_counter()
+        self._spans = [None] * capacity
+        self._count = itertools.count()   # next() is atomic, so threads can share it
+        self._threads = {}                # ident: thread name
+        self._shown = np.full((latencies, 3), np.nan)    # seq, captured, presented
+        self._shown_count = 0
+        self._last_seq = {}               # stream: newest seq shown
+
+    def span(self, name, frame, start, end):
+        """Record `name` from `start` to `end` (perf_counter) for camera frame `frame`."""
+        ident = threading.get_ident()
+        if ident not in self._threads:
+            self._threads[ident] = threading.current_thread().name
+        n = next(self._count)
+        self._spans[n % self.capacity] = (n, name, frame, start, end, ident)
+
+    def shown(self, seq, captured, presented, stream=0):
+        """A present finished at `presented` showing camera frame `seq`, read at
+        `captured`; returns its latency in seconds the first time, else None.
+
+        Each camera is its own `stream` of seqs.
+        """
+        if seq is None or seq <= self._last_seq.get(stream, 0):
+            return None
+        self._last_seq[stream] = seq
+        self._shown[self._shown_count % len(self._shown)] = (seq, captured, presented)
+        self._shown_count += 1
+        return presented - captured
+
+    def _records(self):
+        return sorted(filter(None, self._spans))
+
+    def spans(self):
+        """The recorded spans, oldest first, as (name, frame, start, end, thread name)."""
+        return [(name, frame, start, end, self._threads[ident])
+                for _, name, frame, start, end, ident in self._records()]
+
+    def latencies(self):
+        """Capture-to-photon seconds of the shown frames kept, in order shown."""
+        shown = self._shown[:min(self._shown_count, len(self._shown))]
+        order = np.argsort(shown[:, 2], kind="stable")
+        return shown[order, 2] - shown[order, 1]
+
+    def summary(self):
+        """{"frames", "p50", "p95", "p99", "max"}: latency over the shown frames kept, ms."""
+        latency = self.latencies() * 1000.0
+        if len(latency) == 0:
+            return {"frames": 0}
+        p50, p95, p99 = np.percentile(latency, (50, 95, 99))
+        return {"frames": len(latency), "p50": p50, "p95": p95, "p99": p99,
+                "max": latency.max()}
+
+    def events(self):
+        """Chrome trace events: one complete event per span plus a latency counter."""
+        pid = os.getpid()
+
+        def us(t):
+            return round((t - self.t0) * 1e6, 3)
+
+        events = []
+        for ident, name in self._threads.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": ident,
+                           "args": {"name": name}})
+        main = threading.main_thread().ident
+        for _, name, frame, start, end, ident in self._records():
+            events.append({"name": name, "cat": "frame", "ph": "X", "pid": pid, "tid": ident,
+                           "ts": us(start), "dur": round((end - start) * 1e6, 3),
+                           "args": {} if frame is None else {"frame": int(frame)}})
+        shown = self._shown[:min(self._shown_count, len(self._shown))]
+        for seq, captured, presented in shown[np.argsort(shown[:, 2], kind="stable")]:
+            events.append({"name": "capture to photon", "ph": "C", "pid": pid, "tid": main,
+                           "ts": us(presented),
+                           "args": {"ms": round((presented - captured) * 1000.0, 3)}})
+        return events
+
+    def export(self, path):
+        """Write the trace as Chrome trace event JSON to `path`."""
+        with open(path, "w") as f:
+            json.dump({"traceEvents": self.events(), "displayTimeUnit": "ms"}, f)
@@ -0,0 +1,228 @@
+import multiprocessing
+import threading
+import time
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+# Slots of the shared control array
+PENDING = 0     # input slot holding an unread frame, or -1
+READING = 1     # input slot the worker is analysing, or -1
+SEQ = 2         # SEQ + slot: frame sequence number stored in that input slot
+OUT = 4         # output slot holding the newest grid, or -1
+OUT_SEQ = 5     # frame sequence number that grid was computed from
+
+
+def _serve(analyzer, frames_name, grids_name, frame_shape, grid_shape,
+           state, lock, wake, done, stop):
+    frames_shm = SharedMemory(name=frames_name)
+    grids_shm = SharedMemory(name=grids_name)
+    frames = np.ndarray((2,) + frame_shape, np.uint8, buffer=frames_shm.buf)
+    grids = np.ndarray((2,) + grid_shape, np.float32, buffer=grids_shm.buf)
+
+    try:
+        while not stop.is_set():
+            if not wake.wait(0.1):
+                continue
+            with lock:
+                wake.clear()
+                slot = state[PENDING]
+                if slot < 0:
+                    continue
+                state[PENDING] = -1
+                state[READING] = slot
+                seq = state[SEQ + slot]
+
+            # only this process writes OUT, so it can be read without the lock
+            out = 1 - state[OUT] if state[OUT] >= 0 else 0
+            analyzer(frames[slot], out=grids[out])
+
+            with lock:
+                state[READING] = -1
+                state[OUT] = out
+                state[OUT_SEQ] = seq
+            done.set()
+    finally:
+        del frames, grids
+        frames_shm.close()
+        grids_shm.close()
+
+
+class AnalysisWorker:
+    """Runs an EdgeAnalyzer in a separate process so analysis overlaps rendering.
+
+    Camera frames and result grids live in shared-memory double buffers; only
+    slot indices and sequence numbers cross the process boundary. submit()
+    never waits for the worker: a frame it has not started on yet is replaced
+    by the newer one. result() returns the newest finished grid.
+
+    The worker is started with the "spawn" method, so it must be created
+    from an entry point guarded by `if __name__ == "__main__":`.
+    """
+
+    def __init__(self, analyzer, frame_shape, context="spawn"):
+        self.frame_shape = tuple(frame_shape)
+        self.grid_shape = tuple(analyzer.grid)
+        ctx = multiprocessing.get_context(context)
+
+        frame_bytes = int(np.prod(self.frame_shape))
+        grid_bytes = int(np.prod(self.grid_shape)) * 4
+        self._frames_shm = SharedMemory(create=True, size=2 * frame_bytes)
+        self._grids_shm = SharedMemory(create=True, size=2 * grid_bytes)
+        self._frames = np.ndarray((2,) + self.frame_shape, np.uint8,
+                                  buffer=self._frames_shm.buf)
+        self._grids = np.ndarray((2,) + self.grid_shape, np.float32,
+                                 buffer=self._grids_shm.buf)
+        self._grid = np.zeros(self.grid_shape, np.float32)
+
+        self._state = ctx.Array("q", [-1, -1, 0, 0, -1, 0], lock=False)
+        self._lock = ctx.Lock()
+        self._wake = ctx.Event()
+        self._done = ctx.Event()              # set after every result
+        self._stop = ctx.Event()
+        self._proc = ctx.Process(
+            target=_serve, name="analysis", daemon=True,
+            args=(analyzer, self._frames_shm.name, self._grids_shm.name,
+                  self.frame_shape, self.grid_shape,
+                  self._state, self._lock, self._wake, self._done, self._stop))
+
+    def start(self):
+        self._proc.start()
+        return self
+
+    def close(self):
+        self._stop.set()
+        if self._proc.pid is not None:
+            self._proc.join(timeout=2.0)
+            if self._proc.is_alive():
+                self._proc.terminate()
+        del self._frames, self._grids
+        self._frames_shm.close()
+        self._frames_shm.unlink()
+        self._grids_shm.close()
+        self._grids_shm.unlink()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def alive(self):
+        return self._proc.is_alive()
+
+    def submit(self, frame, seq=0):
+        if frame.shape != self.frame_shape:
+            raise ValueError(f"frame shape {frame.shape} != {self.frame_shape}")
+
+        state = self._state
+        with self._lock:
+            reading = state[READING]
+            if reading >= 0:
+                slot = 1 - reading
+            else:
+                slot = max(state[PENDING], 0)
+            # an unread frame in this slot is superseded by the new one
+            state[PENDING] = -1
+
+        np.copyto(self._frames[slot], frame)
+
+        with self._lock:
+            state[SEQ + slot] = seq
+            state[PENDING] = slot
+        self._wake.set()
+
+    def result(self):
+        """(grid, seq) of the newest analysed frame, or None before the first.
+
+        The grid is a private copy that stays valid until the next call.
+        """
+        state = self._state
+        with self._lock:
+            out = state[OUT]
+            if out < 0:
+                return None
+            np.copyto(self._grid, self._grids[out])
+            seq = state[OUT_SEQ]
+        return self._grid, seq
+
+    def wait(self, seq, timeout=None):
+        """Block until a frame numbered `seq` or later has been analysed.
+
+        Returns False on timeout or if the worker process has died.
+        """
+        end = None if timeout is None else time.perf_counter() + timeout
+        while True:
+            # cleared before looking, so a result landing in between still wakes us
+            self._done.clear()
+            if self._state[OUT] >= 0 and self._state[OUT_SEQ] >= seq:
+                return True
+            if not self.alive:
+                return False
+            left = 0.5 if end is None else min(0.5, end - time.perf_counter())
+            if left <= 0:
+                return False
+            self._done.wait(left)
+
+
+class ProcessAnalyzer:
+    """An EdgeAnalyzer that runs in an AnalysisWorker process, called like one.
+
+    Each call hands the frame to the worker and waits for its grid, so an
+    AnalysisClock thread calling it spends the analysis blocked with the
+    GIL released while the work happens on another core, not in this
+    interpreter. The worker is started at the first frame, sized from it,
+    and restarted if the frame size changes; that first frame also waits
+    for the process to start up.
+
+    With `timer` set, "submit" (copying the frame into shared memory) and
+    "process" (waiting for the worker) are timed; the worker's own stages
+    aren't visible from here.
+
+    analyzer: EdgeAnalyzer to run; a copy goes to the worker
+    """
+
+    def __init__(self, analyzer):
+        self.analyzer = analyzer
+        self.grid = analyzer.grid
+        self.timer = None
+        self.worker = None
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._closing = False
+
+    def __call__(self, frame, out=None):
+        with self._lock:
+            if self._closing:
+                raise RuntimeError("ProcessAnalyzer is closed")
+            if self.worker is None or frame.shape != self.worker.frame_shape:
+                if self.worker is not None:
+                    self.worker.close()
+                self.worker = AnalysisWorker(self.analyzer, frame.shape).start()
+            self._seq += 1
+            self.worker.submit(frame, self._seq)
+            if self.timer is not None:
+                self.timer.lap("submit")
+            # short waits, so close() from another thread isn't held up; a
+            # call it cuts short returns `out` as it was, to a stopped clock
+            while not self.worker.wait(self._seq, 0.1):
+                if self._closing:
+                    return out
+                if not self.worker.alive:
+                    raise RuntimeError("analysis worker process died")
+            grid, _ = self.worker.result()
+            if self.timer is not None:
+                self.timer.lap("process")
+            if out is None:
+                return grid
+            np.copyto(out, grid)
+            return out
+
+    def close(self):
+        """Stop the worker process; safe to call from another thread mid-call."""
+        self._closing = True
+        with self._lock:
+            if self.worker is not None:
+                self.worker.close()
+                self.worker = None